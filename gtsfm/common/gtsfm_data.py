@@ -285,11 +285,11 @@ class GtsfmData:
             if i in camera_indices:
                 new_data.add_camera(i, gtsfm_data.get_camera(i))
 
-        new_camera_indices = new_data.get_valid_camera_indices()
+        new_camera_indices = set(new_data.get_valid_camera_indices())
 
-        # add tracks which have all the camera present in new data
-        for j in range(gtsfm_data.number_tracks()):
-            track = gtsfm_data.get_track(j)
+        # add tracks which have all the camera present in new data. The cameras are checked here already, so the tracks
+        # are appended directly instead of through add_track(), which would read every measurement a second time.
+        for track in gtsfm_data.get_tracks():
             is_valid = True
             for k in range(track.numberMeasurements()):
                 i, _ = track.measurement(k)
@@ -297,7 +297,7 @@ class GtsfmData:
                     is_valid = False
                     break
             if is_valid:
-                new_data.add_track(track)
+                new_data._tracks.append(track)
 
         return new_data
 
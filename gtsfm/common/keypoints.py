@@ -104,8 +104,11 @@ class Keypoints:
         if self.responses is None:
             selection_idxs = np.arange(k, dtype=np.uint32)
         else:
-            # select the values with top response values
-            selection_idxs = np.argpartition(-self.responses, k)[:k]
+            # select the values with top response values, partitioning from the end to avoid negating the responses.
+            # All values after the partition point at (N - k - 1) are at least as large as it, and the slice start is
+            # explicit as [-k:] would select everything for k = 0.
+            num_keypoints = len(self.responses)
+            selection_idxs = np.argpartition(self.responses, num_keypoints - k - 1)[num_keypoints - k :]
 
         return self.extract_indices(selection_idxs), selection_idxs
 
@@ -121,8 +124,10 @@ class Keypoints:
             N <= M keypoints, and their corresponding desciptors as an (N, D) array, such that their (rounded)
                 coordinates corresponded to a 1 in the input mask array.
         """
-        rounded_coordinates = np.round(self.coordinates).astype(int)
-        valid_idxs = np.flatnonzero(mask[rounded_coordinates[:, 1], rounded_coordinates[:, 0]] == 1)
+        rounded_coordinates = np.rint(self.coordinates).astype(np.intp)
+        # Only the mask values at the keypoints are read, so the mask itself is never converted.
+        mask_values = mask[rounded_coordinates[:, 1], rounded_coordinates[:, 0]]
+        valid_idxs = np.flatnonzero(mask_values if mask_values.dtype == bool else mask_values == 1)
 
         return self.extract_indices(valid_idxs), valid_idxs
 
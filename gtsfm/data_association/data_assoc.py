@@ -9,6 +9,7 @@ References:
 
 Authors: Sushmita Warrier, Xiaolong Wu, John Lambert
 """
+import itertools
 import os
 from collections import Counter
 from typing import Dict, List, NamedTuple, Optional, Tuple
@@ -24,6 +25,7 @@ import gtsfm.utils.tracks as track_utils
 from gtsfm.common.gtsfm_data import GtsfmData
 from gtsfm.common.keypoints import Keypoints
 from gtsfm.common.pose_prior import PosePrior
+from gtsfm.common.sfm_track import SfmTrack2d
 from gtsfm.data_association.point3d_initializer import Point3dInitializer, TriangulationOptions, TriangulationExitCode
 from gtsfm.data_association.dsf_tracks_estimator import DsfTracksEstimator
 from gtsfm.common.image import Image
@@ -42,11 +44,14 @@ class DataAssociation(NamedTuple):
                        to be valid.
         triangulation_options: options for triangulating points.
         save_track_patches_viz: whether to save a mosaic of individual patches associated with each track.
+        num_triangulation_chunks: number of chunks the 2d tracks are split into when building the computation graph,
+            each chunk being triangulated as a separate Dask task.
     """
 
     min_track_len: int
     triangulation_options: TriangulationOptions
     save_track_patches_viz: Optional[bool] = False
+    num_triangulation_chunks: int = 8
 
     def __validate_track(self, sfm_track: Optional[SfmTrack]) -> bool:
         """Validate the track by checking its length."""
@@ -79,17 +84,64 @@ class DataAssociation(NamedTuple):
         tracks_estimator = DsfTracksEstimator()
         tracks_2d = tracks_estimator.run(corr_idxs_dict, keypoints_list)
 
+        # Initialize 3D landmark for each track
+        point3d_initializer = Point3dInitializer(cameras, self.triangulation_options)
+        triangulation_results = point3d_initializer.triangulate_batch(tracks_2d)
+
+        return self.assemble(
+            num_images, cameras, tracks_2d, [triangulation_results], cameras_gt, relative_pose_priors, images
+        )
+
+    def triangulate_tracks(
+        self, cameras: Dict[int, gtsfm_types.CAMERA_TYPE], tracks_2d: List[SfmTrack2d]
+    ) -> List[Tuple[Optional[SfmTrack], Optional[float], TriangulationExitCode]]:
+        """Triangulates a chunk of 2d tracks.
+
+        Args:
+            cameras: dictionary, with image index -> camera mapping.
+            tracks_2d: 2d tracks to triangulate.
+
+        Returns:
+            Triangulation results (track, avg. reprojection error, exit code), one per input track.
+        """
+        point3d_initializer = Point3dInitializer(cameras, self.triangulation_options)
+        return point3d_initializer.triangulate_batch(tracks_2d)
+
+    def assemble(
+        self,
+        num_images: int,
+        cameras: Dict[int, gtsfm_types.CAMERA_TYPE],
+        tracks_2d: List[SfmTrack2d],
+        triangulation_results_chunks: List[List[Tuple[Optional[SfmTrack], Optional[float], TriangulationExitCode]]],
+        cameras_gt: List[Optional[gtsfm_types.CALIBRATION_TYPE]],
+        relative_pose_priors: Dict[Tuple[int, int], Optional[PosePrior]],
+        images: Optional[List[Image]] = None,
+    ) -> Tuple[GtsfmData, GtsfmMetricsGroup]:
+        """Forms the GtsfmData from triangulated tracks and computes data association metrics.
+
+        Args:
+            num_images: Number of images in the scene.
+            cameras: dictionary, with image index -> camera mapping.
+            tracks_2d: all 2d tracks in the scene.
+            triangulation_results_chunks: triangulation results for consecutive chunks of `tracks_2d`, which together
+                contain exactly one result per track, in the same order as `tracks_2d`.
+            cameras_gt: list of GT cameras, to be used for benchmarking the tracks.
+            relative_pose_priors: pose priors on the relative pose between camera poses.
+            images: a list of all images in scene (optional and only for track patch visualization)
+
+        Returns:
+            A tuple of GtsfmData with cameras and tracks, and a GtsfmMetricsGroup with data association metrics
+        """
         if self.save_track_patches_viz and images is not None:
             io_utils.save_track_visualizations(tracks_2d, images, save_dir=os.path.join("plots", "tracks_2d"))
 
         # track lengths w/o triangulation check
-        track_lengths_2d = np.array(list(map(lambda x: int(x.number_measurements()), tracks_2d)), dtype=np.uint32)
+        track_lengths_2d = np.fromiter(
+            (track_2d.number_measurements() for track_2d in tracks_2d), dtype=np.uint32, count=len(tracks_2d)
+        )
 
         logger.debug("[Data association] input number of tracks: %s", len(tracks_2d))
-        logger.debug("[Data association] input avg. track length: %s", np.mean(track_lengths_2d))
-
-        # Initialize 3D landmark for each track
-        point3d_initializer = Point3dInitializer(cameras, self.triangulation_options)
+        logger.debug("[Data association] input avg. track length: %s", track_lengths_2d.mean())
 
         # form GtsfmData object after triangulation
         triangulated_data = GtsfmData(num_images)
@@ -104,9 +156,9 @@ class DataAssociation(NamedTuple):
         exit_codes_wrt_computed: List[TriangulationExitCode] = []
         per_accepted_track_avg_errors = []
         per_rejected_track_avg_errors = []
-        for track_2d in tracks_2d:
-            # triangulate and filter based on reprojection error
-            sfm_track, avg_track_reproj_error, triangulation_exit_code = point3d_initializer.triangulate(track_2d)
+        for sfm_track, avg_track_reproj_error, triangulation_exit_code in itertools.chain.from_iterable(
+            triangulation_results_chunks
+        ):
             exit_codes_wrt_computed.append(triangulation_exit_code)
             if triangulation_exit_code == TriangulationExitCode.CHEIRALITY_FAILURE:
                 continue
@@ -137,8 +189,9 @@ class DataAssociation(NamedTuple):
         num_accepted_tracks = connected_data.number_tracks()
         accepted_tracks_ratio = num_accepted_tracks / len(tracks_2d)
 
-        mean_3d_track_length, median_3d_track_length = connected_data.get_track_length_statistics()
+        # a single pass over the tracks, from which all track length statistics are derived
         track_lengths_3d = connected_data.get_track_lengths()
+        mean_3d_track_length = np.mean(track_lengths_3d) if num_accepted_tracks > 0 else 0
 
         logger.debug("[Data association] output number of tracks: %s", num_accepted_tracks)
         logger.debug("[Data association] output avg. track length: %.2f", mean_3d_track_length)
@@ -211,8 +264,41 @@ class DataAssociation(NamedTuple):
             data_assoc_metrics_graph: dictionary with different statistics about the data
                 association result
         """
-        ba_input_graph, data_assoc_metrics_graph = dask.delayed(self.run, nout=2)(
-            num_images, cameras, corr_idxs_graph, keypoints_graph, cameras_gt, relative_pose_priors, images_graph
+        tracks_2d_graph = dask.delayed(DsfTracksEstimator().run)(corr_idxs_graph, keypoints_graph)
+
+        # triangulate chunks of tracks as independent tasks, so they can be distributed across workers
+        tracks_2d_chunks_graph = dask.delayed(split_into_chunks, nout=self.num_triangulation_chunks)(
+            tracks_2d_graph, self.num_triangulation_chunks
+        )
+        triangulation_results_graph = [
+            dask.delayed(self.triangulate_tracks)(cameras, tracks_2d_chunk)
+            for tracks_2d_chunk in tracks_2d_chunks_graph
+        ]
+
+        ba_input_graph, data_assoc_metrics_graph = dask.delayed(self.assemble, nout=2)(
+            num_images,
+            cameras,
+            tracks_2d_graph,
+            triangulation_results_graph,
+            cameras_gt,
+            relative_pose_priors,
+            images_graph,
         )
 
         return ba_input_graph, data_assoc_metrics_graph
+
+
+def split_into_chunks(tracks_2d: List[SfmTrack2d], num_chunks: int) -> List[List[SfmTrack2d]]:
+    """Splits the tracks into consecutive chunks of (almost) equal size.
+
+    Args:
+        tracks_2d: list of N 2d tracks.
+        num_chunks: number of chunks to create.
+
+    Returns:
+        List of exactly `num_chunks` lists (possibly empty), whose concatenation is `tracks_2d`.
+    """
+    num_tracks = len(tracks_2d)
+    return [
+        tracks_2d[(num_tracks * k) // num_chunks : (num_tracks * (k + 1)) // num_chunks] for k in range(num_chunks)
+    ]
@@ -285,6 +285,110 @@ class Point3dInitializer:
 
         return track_3d, avg_track_reproj_error, TriangulationExitCode.SUCCESS
 
+    def triangulate_batch(
+        self, tracks_2d: List[SfmTrack2d]
+    ) -> List[Tuple[Optional[SfmTrack], Optional[float], TriangulationExitCode]]:
+        """Triangulates a batch of tracks w.r.t. the cameras held by this initializer.
+
+        2-view tracks with both cameras estimated (the majority in most scenes) are triangulated together in closed
+        form, see `triangulate_two_view_tracks()`. All other tracks go through `triangulate()`.
+
+        Args:
+            tracks_2d: feature tracks from which measurements are to be extracted.
+
+        Returns:
+            List of (track, avg. reprojection error, exit code) tuples, one per input track and in the same order. See
+                `triangulate()` for the meaning of each entry.
+        """
+        results: List[Optional[Tuple[Optional[SfmTrack], Optional[float], TriangulationExitCode]]] = [None] * len(
+            tracks_2d
+        )
+
+        two_view_idxs = [k for k, track_2d in enumerate(tracks_2d) if self.__is_estimated_two_view_track(track_2d)]
+        if len(two_view_idxs) > 0:
+            two_view_results = self.triangulate_two_view_tracks([tracks_2d[k] for k in two_view_idxs])
+            for k, result in zip(two_view_idxs, two_view_results):
+                results[k] = result
+
+        for k, track_2d in enumerate(tracks_2d):
+            if results[k] is None:
+                results[k] = self.triangulate(track_2d)
+
+        return results
+
+    def __is_estimated_two_view_track(self, track_2d: SfmTrack2d) -> bool:
+        """Checks whether a track has exactly 2 measurements, both in cameras with estimated poses."""
+        return track_2d.number_measurements() == 2 and all(
+            self.track_camera_dict.get(i) is not None for i, _ in track_2d.measurements
+        )
+
+    def triangulate_two_view_tracks(
+        self, tracks_2d: List[SfmTrack2d]
+    ) -> List[Tuple[Optional[SfmTrack], Optional[float], TriangulationExitCode]]:
+        """Triangulates a batch of 2-view tracks with a single vectorized DLT.
+
+        The measurements are first calibrated (i.e. undistorted and normalized), so that the DLT is solved in normalized
+        image coordinates w.r.t. the [R|t] projection matrices. Unlike `triangulate()`, the DLT estimate is not refined
+        with a nonlinear optimization; for 2 views it is already close to the optimum, and bundle adjustment refines
+        the points afterwards. With 2 measurements, the only RANSAC hypothesis is the full track, so the RANSAC modes
+        reduce to checking that both measurements are inliers.
+
+        Args:
+            tracks_2d: feature tracks with exactly 2 measurements each, both in cameras with estimated poses.
+
+        Returns:
+            List of (track, avg. reprojection error, exit code) tuples, one per input track and in the same order. See
+                `triangulate()` for the meaning of each entry.
+        """
+        is_ransac = self.options.mode != TriangulationSamplingMode.NO_RANSAC
+
+        # 3x4 [R|t] (i.e. cTw) projection matrix for each camera appearing in the tracks.
+        camera_idxs = {i for track_2d in tracks_2d for i, _ in track_2d.measurements}
+        extrinsics = {i: self.track_camera_dict[i].pose().inverse().matrix()[:3] for i in camera_idxs}
+
+        num_tracks = len(tracks_2d)
+        cam1_P = np.empty((num_tracks, 3, 4))
+        cam2_P = np.empty((num_tracks, 3, 4))
+        uv1 = np.empty((num_tracks, 2))
+        uv2 = np.empty((num_tracks, 2))
+        for k, track_2d in enumerate(tracks_2d):
+            (i1, uv1_k), (i2, uv2_k) = track_2d.measurements
+            cam1_P[k] = extrinsics[i1]
+            cam2_P[k] = extrinsics[i2]
+            uv1[k] = self.track_camera_dict[i1].calibration().calibrate(uv1_k)
+            uv2[k] = self.track_camera_dict[i2].calibration().calibrate(uv2_k)
+
+        points3d, is_valid = triangulate_two_view_batch(cam1_P, cam2_P, uv1, uv2)
+
+        results = []
+        for track_2d, point3d, is_valid_k in zip(tracks_2d, points3d, is_valid):
+            # A rank-deficient system or a point behind a camera fails like the cheirality check in GTSAM.
+            if not is_valid_k:
+                exit_code = (
+                    TriangulationExitCode.INLIERS_UNDERCONSTRAINED
+                    if is_ransac
+                    else TriangulationExitCode.CHEIRALITY_FAILURE
+                )
+                results.append((None, None, exit_code))
+                continue
+
+            reproj_errors, avg_track_reproj_error = reproj_utils.compute_point_reprojection_errors(
+                self.track_camera_dict, point3d, track_2d.measurements
+            )
+            if not np.all(reproj_errors < self.options.reproj_error_threshold):
+                if is_ransac:
+                    results.append((None, None, TriangulationExitCode.INLIERS_UNDERCONSTRAINED))
+                else:
+                    results.append((None, avg_track_reproj_error, TriangulationExitCode.EXCEEDS_REPROJ_THRESH))
+                continue
+
+            track_3d = SfmTrack(point3d)
+            for i, uv in track_2d.measurements:
+                track_3d.addMeasurement(i, uv)
+            results.append((track_3d, avg_track_reproj_error, TriangulationExitCode.SUCCESS))
+
+        return results
+
     def sample_ransac_hypotheses(
         self,
         track: SfmTrack2d,
@@ -371,6 +475,48 @@ class Point3dInitializer:
         return track_cameras, track_measurements
 
 
+def triangulate_two_view_batch(
+    cam1_P: np.ndarray, cam2_P: np.ndarray, uv1: np.ndarray, uv2: np.ndarray, rank_tol: float = SVD_DLT_RANK_TOL
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Triangulates N points from 2 views each with the DLT, solving all N 4x4 systems with one batched SVD.
+
+    Args:
+        cam1_P: projection matrices of the first view of each point, of shape (N, 3, 4). The left 3x3 block of each
+            matrix must have a positive determinant (e.g. K[R|t] or [R|t]), for the cheirality check to be valid.
+        cam2_P: projection matrices of the second view of each point, of shape (N, 3, 4).
+        uv1: measurements in the first view, of shape (N, 2).
+        uv2: measurements in the second view, of shape (N, 2).
+        rank_tol: minimum value of the 3rd singular value of the DLT system, below which the system is rank-deficient.
+
+    Returns:
+        points3d: triangulated points, of shape (N, 3).
+        is_valid: boolean array of shape (N,), false for rank-deficient systems and for points that are not in front
+            of both cameras.
+    """
+    # Each measurement contributes 2 rows to the DLT system A X = 0, see Hartley & Zisserman, Sec. 12.2.
+    A = np.stack(
+        [
+            uv1[:, 0, np.newaxis] * cam1_P[:, 2] - cam1_P[:, 0],
+            uv1[:, 1, np.newaxis] * cam1_P[:, 2] - cam1_P[:, 1],
+            uv2[:, 0, np.newaxis] * cam2_P[:, 2] - cam2_P[:, 0],
+            uv2[:, 1, np.newaxis] * cam2_P[:, 2] - cam2_P[:, 1],
+        ],
+        axis=1,
+    )
+    _, singular_values, vh = np.linalg.svd(A)
+
+    # The solution is the right singular vector corresponding to the smallest singular value.
+    points3d_h = vh[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        points3d = points3d_h[:, :3] / points3d_h[:, 3:]
+
+    points3d_h1 = np.concatenate([points3d, np.ones((len(points3d), 1))], axis=1)
+    depths1 = np.einsum("nj,nj->n", cam1_P[:, 2], points3d_h1)
+    depths2 = np.einsum("nj,nj->n", cam2_P[:, 2], points3d_h1)
+    is_valid = (singular_values[:, 2] > rank_tol) & (depths1 > 0) & (depths2 > 0)
+    return points3d, is_valid
+
+
 def generate_measurement_pairs(track: SfmTrack2d) -> List[Tuple[int, ...]]:
     """
     Extract all possible measurement pairs in a track for triangulation.
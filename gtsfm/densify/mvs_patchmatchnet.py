@@ -3,8 +3,10 @@
 Authors: Ren Liu
 """
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -32,8 +34,12 @@ PATCHMATCHNET_WEIGHTS_PATH = (
 )
 
 # all default values are assigned by Wang et al. https://github.com/FangjinhuaWang/PatchmatchNet/blob/main/eval.py
-BATCH_SIZE = 1
 NUM_VIEWS = 5
+# number of reference views per inference batch. Unlike Wang et al. (batch size 1), several views are batched to
+#   amortize the per-batch overhead, since all images are resized to the same shape in PatchmatchNetData
+BATCH_SIZE = 4
+# maximum number of batches whose outputs are being copied to host memory while the next batches are inferred
+MAX_NUM_PENDING_BATCHES = 2
 
 # the reprojection error in pixel coordinates should be less than 1
 MAX_GEOMETRIC_PIXEL_THRESH = 1.0
@@ -67,6 +73,7 @@ class MVSPatchmatchNet(MVSBase):
         min_conf_thresh: float = MIN_CONFIDENCE_THRESH,
         min_num_consistent_views: float = MIN_NUM_CONSISTENT_VIEWS,
         num_workers: int = 0,
+        batch_size: int = BATCH_SIZE,
     ) -> Tuple[np.ndarray, np.ndarray, GtsfmMetricsGroup]:
         """Get dense point cloud using PatchmatchNet from GtsfmData. The method implements the densify method in MVSBase
         Ref: Wang et al. https://github.com/FangjinhuaWang/PatchmatchNet/blob/main/eval.py
@@ -84,6 +91,7 @@ class MVSPatchmatchNet(MVSBase):
             min_num_consistent_views: a reconstructed point is consistent in geometry if it satisfies all geometric
                 thresholds in more than min_num_consistent_views source views
             num_workers: number of workers when loading data
+            batch_size: number of reference views inferred together in each batch, limited by the GPU memory
 
         Returns:
             dense_point_cloud: 3D coordinates (in the world frame) of the dense point cloud
@@ -101,10 +109,11 @@ class MVSPatchmatchNet(MVSBase):
 
         loader = DataLoader(
             dataset=dataset,
-            batch_size=BATCH_SIZE,
+            batch_size=batch_size,
             shuffle=False,
             num_workers=num_workers,
             drop_last=False,
+            pin_memory=torch.cuda.is_available(),
         )
 
         model = PatchmatchNet(
@@ -131,10 +140,45 @@ class MVSPatchmatchNet(MVSBase):
         depth_est_list = {}
         confidence_est_list = {}
 
-        batch_times = []
+        ref_img_times = []
+
+        def save_batch_outputs(
+            batch_idx: int,
+            inference_time: float,
+            pm_ids: List[int],
+            depth_ests: torch.Tensor,
+            confidences: torch.Tensor,
+        ) -> None:
+            """Copies the final refined depth maps and the confidence maps of a batch to host memory and saves them.
+            Only those outputs are used afterwards. tensor2numpy() already returns new arrays, so they are stored
+            without copies."""
+            start_time = time.time()
+            # Gradient mode is thread-local, so the main thread's torch.no_grad() does not apply in this worker
+            with torch.no_grad():
+                depth_ests = patchmatchnet_utils.tensor2numpy(depth_ests)
+                photometric_confidences = patchmatchnet_utils.tensor2numpy(confidences)
+
+            for pm_i, depth_est, photometric_confidence in zip(pm_ids, depth_ests, photometric_confidences):
+                depth_est_list[pm_i] = depth_est
+                confidence_est_list[pm_i] = photometric_confidence
+
+            # The time spent waiting in the queue for the worker is not part of the batch time
+            time_elapsed = inference_time + time.time() - start_time
+            # Attribute the batch inference time evenly to the reference views in the batch
+            ref_img_times.extend([time_elapsed / len(pm_ids)] * len(pm_ids))
+
+            logger.debug(
+                "[Densify::PatchMatchNet] Iter %d/%d, time = %.3f",
+                batch_idx + 1,
+                len(loader),
+                time_elapsed,
+            )
 
         logger.info("Starting PatchMatchNet inference...")
-        with torch.no_grad():
+        # The outputs of each batch are copied to host memory in a worker thread, which overlaps with the inference of
+        #   the next batch instead of stalling it. The number of pending batches is bounded to cap the device memory.
+        pending_batches: Deque[Future] = deque()
+        with torch.no_grad(), ThreadPoolExecutor(max_workers=1) as executor:
             for batch_idx, sample in enumerate(loader):
                 start_time = time.time()
 
@@ -153,26 +197,29 @@ class MVSPatchmatchNet(MVSBase):
                     sample_device["depth_min"],
                     sample_device["depth_max"],
                 )
-
-                outputs = patchmatchnet_utils.tensor2numpy(outputs)
+                if torch.cuda.is_available():
+                    # Kernels run asynchronously, so wait for them to time the inference alone
+                    torch.cuda.synchronize()
+                inference_time = time.time() - start_time
 
                 # Save depth maps and confidence maps
-                for pm_i, depth_est, photometric_confidence in zip(
-                    pm_ids, outputs["refined_depth"]["stage_0"], outputs["photometric_confidence"]
-                ):
-                    pm_i = pm_i.cpu().numpy().tolist()
-                    depth_est_list[pm_i] = depth_est.copy()
-                    confidence_est_list[pm_i] = photometric_confidence.copy()
-
-                time_elapsed = time.time() - start_time
-                batch_times.append(time_elapsed)
-
-                logger.debug(
-                    "[Densify::PatchMatchNet] Iter %d/%d, time = %.3f",
-                    batch_idx + 1,
-                    len(loader),
-                    time_elapsed,
+                pending_batches.append(
+                    executor.submit(
+                        save_batch_outputs,
+                        batch_idx,
+                        inference_time,
+                        pm_ids.tolist(),
+                        outputs["refined_depth"]["stage_0"],
+                        outputs["photometric_confidence"],
+                    )
                 )
+                del outputs
+                if len(pending_batches) > MAX_NUM_PENDING_BATCHES:
+                    pending_batches.popleft().result()
+
+            # Wait for the remaining batches, and re-raise any exception from the worker thread
+            while pending_batches:
+                pending_batches.popleft().result()
 
         # Filter inference result with thresholds
         dense_point_cloud, dense_point_colors, filtering_metrics = self.filter_depth(
@@ -189,8 +236,8 @@ class MVSPatchmatchNet(MVSBase):
         densify_metrics = GtsfmMetricsGroup(
             name=METRICS_GROUP,
             metrics=[
-                GtsfmMetric(name="num_valid_reference_views", data=len(loader)),
-                GtsfmMetric(name="elapsed_time_per_ref_img(sec)", data=batch_times),
+                GtsfmMetric(name="num_valid_reference_views", data=len(dataset)),
+                GtsfmMetric(name="elapsed_time_per_ref_img(sec)", data=ref_img_times),
             ],
         )
         # merge filtering metrics to densify metrics
@@ -255,13 +302,30 @@ class MVSPatchmatchNet(MVSBase):
 
         packed_pairs = dataset.get_packed_pairs()
 
+        # Load the camera parameters of every view, and invert them once for all (ref, src) pairs
+        camera_params = {view: dataset.get_camera_params(view) for view in depth_list}
+        camera_params_inv = {
+            view: (np.linalg.inv(intrinsics), np.linalg.inv(extrinsics))
+            for view, (intrinsics, extrinsics) in camera_params.items()
+        }
+
+        # Run the geometric consistency check on the GPU if available, with all depth maps uploaded once
+        use_cuda = torch.cuda.is_available()
+        if use_cuda:
+            depth_maps = {view: torch.from_numpy(depth[0]).cuda() for view, depth in depth_list.items()}
+            check_geometric_consistency = patchmatchnet_eval.check_geometric_consistency_torch
+        else:
+            depth_maps = {view: depth[0] for view, depth in depth_list.items()}
+            check_geometric_consistency = patchmatchnet_eval.check_geometric_consistency
+
         # For each reference view and the corresponding source views
         for pair in packed_pairs:
             ref_view = pair["ref_id"]
             src_views = pair["src_ids"]
 
-            # Load the camera parameters
-            ref_intrinsics, ref_extrinsics = dataset.get_camera_params(ref_view)
+            # Load the camera parameters of the reference view
+            ref_intrinsics, ref_extrinsics = camera_params[ref_view]
+            ref_intrinsics_inv, ref_extrinsics_inv = camera_params_inv[ref_view]
 
             # Load the reference image
             ref_img = dataset.get_image(ref_view)
@@ -273,33 +337,41 @@ class MVSPatchmatchNet(MVSBase):
             #   by checking whether the confidence is larger than the pre-defined confidence threshold
             confidence_mask = confidence > min_conf_thresh
 
-            all_srcview_depth_ests = []
-
-            # Compute the geometric mask, the value of geo_mask_sum means the number of source views where
+            # Accumulate the reference depth and the reprojected depths from all source views in place, and
+            #   compute the geometric mask, the value of geo_mask_sum means the number of source views where
             #   the reference depth is valid according to the geometric thresholds
-            geo_mask_sum = 0
+            if use_cuda:
+                depth_sum = depth_maps[ref_view].clone()
+                geo_mask_sum = torch.zeros_like(depth_sum, dtype=torch.int32)
+            else:
+                depth_sum = ref_depth_est.copy()
+                geo_mask_sum = np.zeros(ref_depth_est.shape, dtype=np.int32)
             for src_view in src_views:
                 # camera parameters of the source view
-                src_intrinsics, src_extrinsics = dataset.get_camera_params(src_view)
-
-                # the estimated depth of the source view
-                src_depth_est = depth_list[src_view][0]
+                src_intrinsics, src_extrinsics = camera_params[src_view]
+                src_intrinsics_inv, src_extrinsics_inv = camera_params_inv[src_view]
 
-                # Check geometric consistency
-                geo_mask, depth_reprojected, _, _ = patchmatchnet_eval.check_geometric_consistency(
-                    ref_depth_est,
+                # Check geometric consistency, and add the geometric mask and the reprojected depth to the sums
+                check_geometric_consistency(
+                    depth_maps[ref_view],
                     ref_intrinsics,
                     ref_extrinsics,
-                    src_depth_est,
+                    depth_maps[src_view],
                     src_intrinsics,
                     src_extrinsics,
                     max_geo_pixel_thresh,
                     max_geo_depth_thresh,
+                    intrinsics_ref_inv=ref_intrinsics_inv,
+                    extrinsics_ref_inv=ref_extrinsics_inv,
+                    intrinsics_src_inv=src_intrinsics_inv,
+                    extrinsics_src_inv=src_extrinsics_inv,
+                    geo_mask_sum_out=geo_mask_sum,
+                    depth_sum_out=depth_sum,
                 )
-                geo_mask_sum += geo_mask.astype(np.int32)
-                all_srcview_depth_ests.append(depth_reprojected)
+            if use_cuda:
+                depth_sum, geo_mask_sum = depth_sum.cpu().numpy(), geo_mask_sum.cpu().numpy()
 
-            depth_est_averaged = (sum(all_srcview_depth_ests) + ref_depth_est) / (geo_mask_sum + 1)
+            depth_est_averaged = depth_sum / (geo_mask_sum + 1)
             # Valid points requires at least 3 source views validated under geometric threshoulds
             geo_mask = geo_mask_sum >= min_num_consistent_views
 
@@ -315,6 +387,8 @@ class MVSPatchmatchNet(MVSBase):
                     depth_list=depth_list,
                     max_reprojection_err=max_geo_pixel_thresh,
                     joint_mask=joint_mask,
+                    camera_params=camera_params,
+                    camera_params_inv=camera_params_inv,
                 )
             )
             # Set the depths of invalid positions to 0
@@ -322,19 +396,18 @@ class MVSPatchmatchNet(MVSBase):
             # Append the depth map to the depth map list
             depths.append(depth_est_averaged)
 
-            # Initialize coordinate grids
-            height, width = depth_est_averaged.shape[:2]
-            u, v = np.meshgrid(np.arange(0, width), np.arange(0, height))
+            # Get the (cached) coordinate grids
+            u, v = patchmatchnet_eval.pixel_grid(*depth_est_averaged.shape[:2])
 
             # Get valid points filtered by confidence and geometric thresholds
             valid_points = joint_mask
             u, v, depth = u[valid_points], v[valid_points], depth_est_averaged[valid_points]
 
             # Get the point coordinates inside the reference view's camera frame
-            itj = np.linalg.inv(ref_intrinsics) @ mvs_utils.cart_to_homogenous(np.array([u, v])) * depth
+            itj = ref_intrinsics_inv @ mvs_utils.cart_to_homogenous(np.array([u, v])) * depth
 
             # Get the point coordinates inside the world frame
-            wtj = (np.linalg.inv(ref_extrinsics) @ mvs_utils.cart_to_homogenous(itj))[:3]
+            wtj = (ref_extrinsics_inv @ mvs_utils.cart_to_homogenous(itj))[:3]
             vertices.append(wtj.T)
 
             # Get the point colors for colored mesh
@@ -378,6 +451,8 @@ def compute_filtered_reprojection_error(
     depth_list: Dict[int, np.ndarray],
     max_reprojection_err: float,
     joint_mask: np.ndarray,
+    camera_params: Optional[Dict[int, Tuple[np.ndarray, np.ndarray]]] = None,
+    camera_params_inv: Optional[Dict[int, Tuple[np.ndarray, np.ndarray]]] = None,
 ) -> List[float]:
     """Compute reprojection errors of reference view pixels among all source views, filtered by joint mask
     Detailed steps include:
@@ -395,6 +470,8 @@ def compute_filtered_reprojection_error(
         depth_list: list of batched 2D depth maps (1, H, W) from each reference view
         max_reprojection_err: maximum reprojection error in pixels
         joint_mask: the union set of geometric mask and confidence mask, in shape of (H, W)
+        camera_params: optional precomputed (intrinsics, extrinsics) of each view, loaded from the dataset if None
+        camera_params_inv: optional precomputed inverses of (intrinsics, extrinsics) of each view, computed if None
 
     Returns:
         list of filtered reprojection errors among all source views in the reference view
@@ -404,18 +481,25 @@ def compute_filtered_reprojection_error(
 
     # get reference view estimated depth map
     ref_depth_est = depth_list[ref_view][0]
-    # get the resolution of reference view depth map
-    height, width = ref_depth_est.shape[:2]
-    # get camera parameters of the reference view
-    ref_intrinsics, ref_extrinsics = dataset.get_camera_params(ref_view)
+    # get camera parameters of all views involved, and their inverses
+    if camera_params is None:
+        camera_params = {view: dataset.get_camera_params(view) for view in [ref_view] + list(src_views)}
+    if camera_params_inv is None:
+        camera_params_inv = {
+            view: (np.linalg.inv(intrinsics), np.linalg.inv(extrinsics))
+            for view, (intrinsics, extrinsics) in camera_params.items()
+        }
+    ref_intrinsics, ref_extrinsics = camera_params[ref_view]
+    ref_intrinsics_inv, ref_extrinsics_inv = camera_params_inv[ref_view]
 
     # Compute reprojection error after filtering by joint mask
     # 1. generate reference coordinates for each pixel
-    u_ref, v_ref = np.meshgrid(np.arange(0, width), np.arange(0, height))
+    u_ref, v_ref = patchmatchnet_eval.pixel_grid(*ref_depth_est.shape[:2])
     # 2. compute reprojection errors from each reference-source view pair
     for src_view in src_views:
         # camera parameters of the source view
-        src_intrinsics, src_extrinsics = dataset.get_camera_params(src_view)
+        src_intrinsics, src_extrinsics = camera_params[src_view]
+        src_intrinsics_inv, src_extrinsics_inv = camera_params_inv[src_view]
 
         # the estimated depth of the source view
         src_depth_est = depth_list[src_view][0]
@@ -428,6 +512,10 @@ def compute_filtered_reprojection_error(
             src_depth_est,
             src_intrinsics,
             src_extrinsics,
+            intrinsics_ref_inv=ref_intrinsics_inv,
+            extrinsics_ref_inv=ref_extrinsics_inv,
+            intrinsics_src_inv=src_intrinsics_inv,
+            extrinsics_src_inv=src_extrinsics_inv,
         )
 
         # compute reprojection error
@@ -74,20 +74,12 @@ def calculate_triangulation_angles_in_degrees(
     camera_center_1: np.ndarray = camera_1.pose().translation()
     camera_center_2: np.ndarray = camera_2.pose().translation()
 
-    N = points_3d.shape[0]
     # ensure broadcasting is in the correct direction
-    rays1 = points_3d - camera_center_1.reshape(1, 3)
-    rays2 = points_3d - camera_center_2.reshape(1, 3)
-
-    # normalize rays to unit length
-    rays1 /= np.linalg.norm(rays1, axis=1).reshape(N, 1)
-    rays2 /= np.linalg.norm(rays2, axis=1).reshape(N, 1)
-
-    dot_products = np.multiply(rays1, rays2).sum(axis=1)
-    dot_products = np.clip(dot_products, -1, 1)
-    angles_rad = np.arccos(dot_products)
-    angles_deg = np.rad2deg(angles_rad)
-    return angles_deg
+    return calculate_triangulation_angles_in_degrees_batch(
+        camera_centers_1=camera_center_1.reshape(1, 3),
+        camera_centers_2=camera_center_2.reshape(1, 3),
+        points_3d=points_3d,
+    )
 
 
 def piecewise_gaussian(theta: float, theta_0: float = 5, sigma_1: float = 1, sigma_2: float = 10) -> float:
@@ -120,6 +112,51 @@ def piecewise_gaussian(theta: float, theta_0: float = 5, sigma_1: float = 1, sig
     return math.exp(-((theta - theta_0) ** 2) / (2 * sigma ** 2))
 
 
+def piecewise_gaussian_batch(
+    thetas: np.ndarray, theta_0: float = 5, sigma_1: float = 1, sigma_2: float = 10
+) -> np.ndarray:
+    """Vectorized version of piecewise_gaussian(), evaluated for a batch of baseline angles at once.
+
+    Args:
+        thetas: (N,) array of input baseline angles.
+        theta_0: defaults to 5, the expected baseline angle of the function.
+        sigma_1: defaults to 1, the standard deviation of the function when the angle is no larger than theta_0.
+        sigma_2: defaults to 10, the standard deviation of the function when the angle is larger than theta_0.
+
+    Returns:
+        (N,) array of results of the Gaussian function, in range (0, 1]
+    """
+    sigmas = np.where(thetas <= theta_0, sigma_1, sigma_2)
+    return np.exp(-((thetas - theta_0) ** 2) / (2 * sigmas ** 2))
+
+
+def calculate_triangulation_angles_in_degrees_batch(
+    camera_centers_1: np.ndarray, camera_centers_2: np.ndarray, points_3d: np.ndarray
+) -> np.ndarray:
+    """Vectorized calculation of the triangulation angles of 3D points, each seen by its own pair of cameras.
+
+    See calculate_triangulation_angle_in_degrees() for the definition of the angle.
+
+    Args:
+        camera_centers_1: (N,3) centers of the first camera of each pair, or (1,3) if shared by all points.
+        camera_centers_2: (N,3) centers of the second camera of each pair, or (1,3) if shared by all points.
+        points_3d: (N,3) 3d points, where the angle between the rays from the two camera centers is computed.
+
+    Returns:
+        (N,) array of the angles formed at the 3d points, in degrees.
+    """
+    rays1 = points_3d - camera_centers_1
+    rays2 = points_3d - camera_centers_2
+
+    # normalize rays to unit length
+    rays1 /= np.linalg.norm(rays1, axis=1, keepdims=True)
+    rays2 /= np.linalg.norm(rays2, axis=1, keepdims=True)
+
+    dot_products = np.einsum("ij,ij->i", rays1, rays2)
+    dot_products = np.clip(dot_products, -1, 1)
+    return np.rad2deg(np.arccos(dot_products))
+
+
 def cart_to_homogenous(
     non_homogenous_coordinates: np.ndarray,
 ) -> np.ndarray:
@@ -153,7 +190,7 @@ def estimate_voxel_scales(points: np.ndarray) -> np.ndarray:
         voxel scales along 3 orthogonal axes in the descent order
     """
     # center the point cloud
-    centered_points = ellipsoid_utils.center_point_cloud(points)
+    centered_points, _ = ellipsoid_utils.center_point_cloud(points)
 
     # get semi-axis lengths in all axes of the centered point cloud
     _, singular_values = ellipsoid_utils.get_right_singular_vectors(centered_points)
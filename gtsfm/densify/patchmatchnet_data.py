@@ -106,6 +106,13 @@ class PatchmatchNetData(Dataset):
         # Initialize empty lists to collect all possible depths for each view
         depths = defaultdict(list)
 
+        # Collect the view pair indices, camera centers and track points of every (track, view pair) combination, so
+        #   that the baseline angles and Gaussian scores can be computed in a single vectorized pass
+        pair_indices = []
+        pair_points = []
+        pair_centers_1 = []
+        pair_centers_2 = []
+
         for j in range(num_tracks):
             track = self._sfm_result.get_track(j)
             num_measurements = track.numberMeasurements()
@@ -119,9 +126,10 @@ class PatchmatchNetData(Dataset):
                     logger.info("Camera %d had no estimated pose, so skipping during MVS.", i1)
                     continue
                 pm_i1 = self._camera_idx_to_patchmatchnet_idx[i1]
+                wTi1 = self._sfm_result.get_camera(i1).pose()
 
                 # Calculate track j's depth in the camera i1 frame
-                z1 = self._sfm_result.get_camera(i1).pose().transformTo(wtj)[-1]
+                z1 = wTi1.transformTo(wtj)[-1]
                 # Update image i1's depth list only when i1 in a valid camera
                 depths[pm_i1].append(z1)
 
@@ -135,18 +143,25 @@ class PatchmatchNetData(Dataset):
                         continue
                     pm_i2 = self._camera_idx_to_patchmatchnet_idx[i2]
 
-                    # If both cameras are valid, calculate the score of track j in view pair (pm_i1, pm_i2)
-                    #   1. calculate the baseline angle of track j
-                    theta_i1_i2 = mvs_utils.calculate_triangulation_angle_in_degrees(
-                        camera_1=self._sfm_result.get_camera(i1),
-                        camera_2=self._sfm_result.get_camera(i2),
-                        point_3d=wtj,
-                    )
-                    #   2. calculate the result of the Gaussian function as the score
-                    score_i1_i2 = mvs_utils.piecewise_gaussian(theta=theta_i1_i2)
-                    #   3. add the score of track j to the total score of view pair (pm_i1, pm_i2)
-                    pair_scores[pm_i2, pm_i1] += score_i1_i2
-                    pair_scores[pm_i1, pm_i2] += score_i1_i2
+                    # If both cameras are valid, track j contributes a score to view pair (pm_i1, pm_i2)
+                    pair_indices.append((pm_i1, pm_i2))
+                    pair_points.append(wtj)
+                    pair_centers_1.append(wTi1.translation())
+                    pair_centers_2.append(self._sfm_result.get_camera(i2).pose().translation())
+
+        if len(pair_indices) > 0:
+            pair_indices = np.array(pair_indices)
+            #   1. calculate the baseline angles of all tracks in all view pairs
+            thetas = mvs_utils.calculate_triangulation_angles_in_degrees_batch(
+                camera_centers_1=np.array(pair_centers_1),
+                camera_centers_2=np.array(pair_centers_2),
+                points_3d=np.array(pair_points),
+            )
+            #   2. calculate the results of the Gaussian function as the scores
+            scores = mvs_utils.piecewise_gaussian_batch(thetas=thetas)
+            #   3. add the score of each track to the total score of its view pair, in both directions
+            np.add.at(pair_scores, (pair_indices[:, 1], pair_indices[:, 0]), scores)
+            np.add.at(pair_scores, (pair_indices[:, 0], pair_indices[:, 1]), scores)
 
         # Sort pair scores, for i-th row, choose the largest (num_views-1) scores, the corresponding views are selected
         #   as (num_views-1) source views for i-th reference view.
@@ -155,9 +170,8 @@ class PatchmatchNetData(Dataset):
         # Filter out depth outliers and calculate depth ranges
         depth_ranges = np.zeros((self._num_valid_cameras, 2))
         for i in range(self._num_valid_cameras):
-            # image i must have at least 1 depth value, calculate the proper depth range
-            depth_ranges[i, 0] = np.percentile(depths[i], MIN_DEPTH_PERCENTILE)
-            depth_ranges[i, 1] = np.percentile(depths[i], MAX_DEPTH_PERCENTILE)
+            # image i must have at least 1 depth value, calculate the proper depth range with a single percentile call
+            depth_ranges[i] = np.percentile(depths[i], [MIN_DEPTH_PERCENTILE, MAX_DEPTH_PERCENTILE])
 
         return src_views_dict, depth_ranges
 
@@ -6,7 +6,7 @@ Authors: Akshay Krishnan
 import os
 import argparse
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 from gtsfm.evaluation.metrics import GtsfmMetricsGroup
@@ -48,6 +48,29 @@ def save_other_metrics(other_pipeline_files_dirpath: str, other_pipeline_json_pa
         logger.info("%s does not exist", other_pipeline_files_dirpath)
 
 
+def read_metrics_groups(
+    json_dirpath: str, parsed_metrics_groups: Dict[str, GtsfmMetricsGroup]
+) -> List[GtsfmMetricsGroup]:
+    """Reads the metrics groups of all GTSfM modules from a directory, in the order of GTSFM_MODULE_METRICS_FNAMES.
+
+    Args:
+        json_dirpath: Path to folder that contains the metrics as json files.
+        parsed_metrics_groups: Metrics groups parsed earlier, keyed by absolute path. Files found in it are not parsed
+            again, and newly parsed files are added to it.
+
+    Returns:
+        Metrics groups of all modules.
+    """
+    metrics_groups = []
+    for filename in GTSFM_MODULE_METRICS_FNAMES:
+        metric_path = os.path.abspath(os.path.join(json_dirpath, filename))
+        if metric_path not in parsed_metrics_groups:
+            logger.info("Adding metrics from %s", metric_path)
+            parsed_metrics_groups[metric_path] = GtsfmMetricsGroup.parse_from_json(metric_path)
+        metrics_groups.append(parsed_metrics_groups[metric_path])
+    return metrics_groups
+
+
 def create_metrics_plots_html(
     json_path: str, output_dir: str, colmap_json_dirpath: Optional[str], openmvg_json_dirpath: Optional[str]
 ) -> None:
@@ -61,33 +84,21 @@ def create_metrics_plots_html(
         colmap_json_dirpath: The path to the directory of colmap outputs in json files.
         openmvg_json_dirpath: The path to the directory of openmvg outputs in json files.
     """
-    gtsfm_metrics_groups = []
-    # The provided JSON path must contain these files which contain metrics from the respective modules.
+    # Each file is parsed at most once, even if several pipelines point to the same directory.
+    parsed_metrics_groups: Dict[str, GtsfmMetricsGroup] = {}
 
-    metric_paths = []
-    for filename in GTSFM_MODULE_METRICS_FNAMES:
-        logger.info("Adding metrics from %s", filename)
-        metric_path = os.path.join(json_path, filename)
-        metric_paths.append(metric_path)
-        gtsfm_metrics_groups.append(GtsfmMetricsGroup.parse_from_json(metric_path))
+    # The provided JSON path must contain these files which contain metrics from the respective modules.
+    gtsfm_metrics_groups = read_metrics_groups(json_path, parsed_metrics_groups)
     if len(output_dir) == 0:
         output_dir = json_path
     output_file = os.path.join(output_dir, "gtsfm_metrics_report.html")
-    other_pipeline_metrics_groups = {}
 
-    colmap_metrics_groups = []
-    openmvg_metrics_groups = []
-    for json_path, metrics_groups, pipeline_name in zip(
-        [colmap_json_dirpath, openmvg_json_dirpath],
-        [colmap_metrics_groups, openmvg_metrics_groups],
-        ["colmap", "openmvg"],
-    ):
-        if json_path is not None:
-            for i, metrics_group in enumerate(gtsfm_metrics_groups):
-                metric_path = metric_paths[i]
-                json_metric_path = os.path.join(json_path, os.path.basename(metric_path))
-                metrics_groups.append(GtsfmMetricsGroup.parse_from_json(json_metric_path))
-            other_pipeline_metrics_groups[pipeline_name] = metrics_groups
+    other_pipeline_metrics_groups = {}
+    for pipeline_json_dirpath, pipeline_name in zip([colmap_json_dirpath, openmvg_json_dirpath], ["colmap", "openmvg"]):
+        if pipeline_json_dirpath is not None:
+            other_pipeline_metrics_groups[pipeline_name] = read_metrics_groups(
+                pipeline_json_dirpath, parsed_metrics_groups
+            )
     metrics_report.generate_metrics_report_html(gtsfm_metrics_groups, output_file, other_pipeline_metrics_groups)
 
 
@@ -7,21 +7,28 @@ Authors: John Lambert, Neha Upadhyay
 """
 
 import argparse
+import functools
 import yaml
 from collections import defaultdict
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
+import dask
 import numpy as np
 import plotly.graph_objects as go
-from matplotlib import colors
 from matplotlib.colors import LinearSegmentedColormap
-from plotly.graph_objs.layout import Annotation, Font, Margin, XAxis, YAxis
+from plotly.graph_objs.layout import Font, Margin, XAxis, YAxis
 
 import gtsfm.evaluation.merge_reports as report_utils
 import gtsfm.evaluation.metrics_report as metrics_report
 import gtsfm.utils.metrics as metrics_utils
 
+try:
+    # LibYAML's C loader is much faster than the pure-Python one, but is only available if PyYAML was built with it
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 HEATMAP_WIDTH = 1500
 HEATMAP_HEIGHT = 900
@@ -61,9 +68,17 @@ def colorscale_from_list(colorlist: List[str]) -> List[str]:
     Returns:
         colorscale: list of length (NUM_COLORS_COLORMAP+1) representing a list of colors.
     """
-    cmap = LinearSegmentedColormap.from_list(name="dummy_name", colors=colorlist)
-    colorscale = [colors.rgb2hex(cmap(k * 1 / NUM_COLORS_COLORMAP)) for k in range(NUM_COLORS_COLORMAP + 1)]
-    return colorscale
+    return list(_colorscale_from_tuple(tuple(colorlist)))
+
+
+@functools.lru_cache(maxsize=None)
+def _colorscale_from_tuple(colortuple: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Cached implementation of colorscale_from_list(), as the same colorscale is used for every table."""
+    cmap = LinearSegmentedColormap.from_list(name="dummy_name", colors=colortuple)
+    # Sample all colors in one call, and format their 8-bit RGB channels as hex strings, like `rgb2hex()`.
+    rgba = cmap(np.arange(NUM_COLORS_COLORMAP + 1) / NUM_COLORS_COLORMAP)
+    rgb_uint8 = np.round(rgba[:, :3] * 255).astype(np.uint8)
+    return tuple("#" + rgb.tobytes().hex() for rgb in rgb_uint8)
 
 
 def plot_colored_table(
@@ -91,14 +106,17 @@ def plot_colored_table(
     # Clip "Z" to -20% and +20%. The clipping is only for the color -- the text will still display the correct numbers.
     tab_data_clipped = np.clip(tab_data, a_min=MIN_RENDERABLE_PERCENT_CHANGE, a_max=MAX_RENDERABLE_PERCENT_CHANGE)
 
-    H, W = tab_data.shape
-    hovertext_table = np.empty((H, W), dtype=object)
-    for i in range(H):
-        for j in range(W):
-            cell_text = f"Master: {master_values[i,j]}<br />"
-            cell_text += f"Branch: {branch_values[i,j]} <br />"
-            cell_text += f"Percentage: {tab_data[i,j]}"
-            hovertext_table[i, j] = cell_text
+    hovertext_table = functools.reduce(
+        np.char.add,
+        [
+            "Master: ",
+            master_values.astype(str),
+            "<br />Branch: ",
+            branch_values.astype(str),
+            " <br />Percentage: ",
+            tab_data.astype(str),
+        ],
+    )
 
     redgreen = [RED_HEX, PALE_YELLOW_HEX, GREEN_HEX]
     colorscale = colorscale_from_list(redgreen)
@@ -129,24 +147,19 @@ def plot_colored_table(
         margin=Margin(l=135, r=40, b=85, t=170),
     )
 
-    fig = go.Figure(data=[trace], layout=layout)
-
-    annotations = []
+    # Label each cell with its percentage change. A single text-only scatter trace is used instead of one layout
+    #   annotation per cell, which is much cheaper to build and serialize for large tables.
     num_rows, num_cols = tab_data.shape
-    for i in range(num_rows):
-        for j in range(num_cols):
-            annotations.append(
-                Annotation(
-                    text=str(np.round(tab_data[i, j], 1)) + "%",
-                    x=col_labels[j],
-                    y=row_labels[i],
-                    xref="x1",
-                    yref="y1",
-                    font=dict(color="rgb(25,25,25)"),
-                    showarrow=False,
-                )
-            )
-    fig["layout"].update(annotations=annotations)
+    text_trace = go.Scatter(
+        x=np.tile(col_labels, num_rows).tolist(),
+        y=np.repeat(row_labels, num_cols).tolist(),
+        text=np.char.add(np.round(tab_data, 1).astype(str), "%").ravel().tolist(),
+        mode="text",
+        textfont=dict(color="rgb(25,25,25)"),
+        hoverinfo="skip",
+    )
+
+    fig = go.Figure(data=[trace, text_trace], layout=layout)
     return fig.to_html(full_html=False, include_plotlyjs="cdn")
 
 
@@ -161,7 +174,7 @@ def generate_artifact_fnames_from_workflow(workflow_yaml_fpath: str) -> List[str
     """
     with open(workflow_yaml_fpath, "r") as stream:
         try:
-            yaml_data = yaml.safe_load(stream)
+            yaml_data = yaml.load(stream, Loader=SafeLoader)
         except yaml.YAMLError as exc:
             print(exc)
             raise RuntimeError("YAML file could not be parsed safely.")
@@ -169,12 +182,74 @@ def generate_artifact_fnames_from_workflow(workflow_yaml_fpath: str) -> List[str
     benchmark_entries = yaml_data["jobs"]["benchmark"]["strategy"]["matrix"]["config_dataset_info"]
 
     # Note: CI converts "True" to "true", so we must force lower-case on the last string entry.
-    artifact_fnames = [
-        f"{e[0]}-{e[1]}-{e[2]}-{e[3]}-{e[4]}-{e[5]}-{e[6]}-{str(e[7]).lower()}.zip" for e in benchmark_entries
-    ]
+    artifact_fnames = ["-".join(map(str, e[:7])) + f"-{str(e[7]).lower()}.zip" for e in benchmark_entries]
     return artifact_fnames
 
 
+def extract_tables_from_report_if_exists(report_fpath: str) -> Optional[report_utils.SINGLE_REPORT_TABLES]:
+    """Extract the tables from an HTML report, or return None if the report does not exist.
+
+    Args:
+        report_fpath: file path to a GTSFM HTML report.
+
+    Returns:
+        Dictionary mapping the names of GTSFM modules to their associated table information, see
+            `merge_reports.extract_tables_from_report()`, or None if the report is missing.
+    """
+    try:
+        return report_utils.extract_tables_from_report(report_fpath)
+    except FileNotFoundError:
+        return None
+
+
+def merge_tables_if_exist(
+    tables_dict1: Optional[report_utils.SINGLE_REPORT_TABLES], tables_dict2: Optional[report_utils.SINGLE_REPORT_TABLES]
+) -> Optional[report_utils.MERGED_REPORT_TABLES]:
+    """Merge the tables of two reports (see `merge_reports.merge_tables()`), or return None if either is missing."""
+    if tables_dict1 is None or tables_dict2 is None:
+        return None
+    return report_utils.merge_tables(tables_dict1, tables_dict2)
+
+
+def load_merged_tables(
+    curr_master_dirpath: str, new_branch_dirpath: str, zip_artifacts: List[str], scheduler: str = "processes"
+) -> Dict[str, report_utils.MERGED_REPORT_TABLES]:
+    """Parse the master and branch reports of each benchmark once, and merge them, as a single Dask graph.
+
+    Args:
+        curr_master_dirpath: path to directory containing benchmark artifacts for the master branch.
+        new_branch_dirpath: path to directory containing benchmark artifacts for a new branch.
+        zip_artifacts: file names of CI artifacts.
+        scheduler: Dask scheduler used to compute the graph. Parsing is pure Python, so processes give the most
+            parallelism; "threads" or "sync" can be used where multiprocessing is unavailable.
+
+    Returns:
+        Mapping from the artifact file name to the merged tables of the master and branch reports. Benchmarks for which
+            either report is missing are skipped.
+    """
+    merged_tables_graph = []
+    for zip_artifact in zip_artifacts:
+        # TODO(dellaert): use pathlib
+        report1_fpath = f"{curr_master_dirpath}/results-{zip_artifact}/result_metrics/gtsfm_metrics_report.html"
+        report2_fpath = f"{new_branch_dirpath}/results-{zip_artifact}/result_metrics/gtsfm_metrics_report.html"
+        merged_tables_graph.append(
+            dask.delayed(merge_tables_if_exist)(
+                dask.delayed(extract_tables_from_report_if_exists)(report1_fpath),
+                dask.delayed(extract_tables_from_report_if_exists)(report2_fpath),
+            )
+        )
+
+    merged_tables_list = dask.compute(*merged_tables_graph, scheduler=scheduler)
+
+    merged_tables_dicts = {}
+    for zip_artifact, merged_tables_dict in zip(zip_artifacts, merged_tables_list):
+        if merged_tables_dict is None:
+            print(f"WARNING: skipping {zip_artifact}")
+            continue
+        merged_tables_dicts[zip_artifact] = merged_tables_dict
+    return merged_tables_dicts
+
+
 def generate_dashboard(curr_master_dirpath: str, new_branch_dirpath: str) -> None:
     """Generate a dashboard showing a visual representation of the diff against master on all benchmarks.
 
@@ -186,12 +261,12 @@ def generate_dashboard(curr_master_dirpath: str, new_branch_dirpath: str) -> Non
         new_branch_dirpath: path to directory containing benchmark artifacts for a new branch.
     """
     zip_artifacts = generate_artifact_fnames_from_workflow(workflow_yaml_fpath=BENCHMARK_YAML_FPATH)
+    # The reports are the same for all tables, so they are only parsed once.
+    merged_tables_dicts = load_merged_tables(curr_master_dirpath, new_branch_dirpath, zip_artifacts)
 
-    f = open(DASHBOARD_HTML_SAVE_FPATH, mode="w")
-
-    # Write HTML headers.
-    f.write("<!DOCTYPE html>" "<html>")
-    f.write(metrics_report.get_html_header())
+    # The HTML is accumulated in parts and written to file at once.
+    # HTML headers.
+    html_parts = ["<!DOCTYPE html>" "<html>", metrics_report.get_html_header()]
 
     # Loop over each table in the HTML report.
     for table_name in TABLE_NAMES:
@@ -204,21 +279,10 @@ def generate_dashboard(curr_master_dirpath: str, new_branch_dirpath: str) -> Non
         benchmark_table_vals = defaultdict(dict)
 
         # Loop over each benchmark result (columns of table).
-        for zip_artifact in zip_artifacts:
-            # TODO(dellaert): use pathlib
-            report1_fpath = f"{curr_master_dirpath}/results-{zip_artifact}/result_metrics/gtsfm_metrics_report.html"
-            report2_fpath = f"{new_branch_dirpath}/results-{zip_artifact}/result_metrics/gtsfm_metrics_report.html"
-            try:
-                tables_dict1 = report_utils.extract_tables_from_report(report1_fpath)
-                tables_dict2 = report_utils.extract_tables_from_report(report2_fpath)
-            except FileNotFoundError:
-                print(f"WARNING: skipping {zip_artifact}")
-                continue
-
+        for zip_artifact, merged_tables_dict in merged_tables_dicts.items():
             print(f"Comparing {zip_artifact}")
             label = zip_artifact[:MAX_NUM_CHARS_ARTIFACT_FNAME]
             col_labels.append(label)
-            merged_tables_dict = report_utils.merge_tables(tables_dict1, tables_dict2)
 
             # Loop over each metric within this table (rows of table).
             for i, (metric_name, master_val, branch_val) in enumerate(merged_tables_dict[table_name]):
@@ -250,31 +314,30 @@ def generate_dashboard(curr_master_dirpath: str, new_branch_dirpath: str) -> Non
         N_metrics = len(benchmark_table_vals.keys())
         M_benchmarks = len(col_labels)
         row_labels = list(benchmark_table_vals.keys())
-        tab_data = np.zeros((N_metrics, M_benchmarks))
-        master_values = np.zeros((N_metrics, M_benchmarks))
-        branch_values = np.zeros((N_metrics, M_benchmarks))
-
-        for i, (metric_name, benchmark_vals_dict) in enumerate(benchmark_table_vals.items()):
+        # Metrics missing from a benchmark are left as NaN.
+        tab_data = np.full((N_metrics, M_benchmarks), np.nan)
+        master_values = np.full((N_metrics, M_benchmarks), np.nan)
+        branch_values = np.full((N_metrics, M_benchmarks), np.nan)
 
+        for i, benchmark_vals_dict in enumerate(benchmark_table_vals.values()):
             for j, col_label in enumerate(col_labels):
-                if col_label in benchmark_vals_dict.keys():
-                    master_val, branch_val, percentage_change = benchmark_vals_dict.get(col_label)
-                else:
-                    master_val, branch_val, percentage_change = np.nan, np.nan, np.nan
-                tab_data[i, j] = percentage_change
-                master_values[i, j] = master_val
-                branch_values[i, j] = branch_val
+                benchmark_vals = benchmark_vals_dict.get(col_label)
+                if benchmark_vals is not None:
+                    master_values[i, j], branch_values[i, j], tab_data[i, j] = benchmark_vals
 
         table_html = plot_colored_table(
             master_values, branch_values, row_labels=row_labels, col_labels=col_labels, tab_data=tab_data
         )
 
-        # Write name of the metric group in human readable form.
-        f.write(metrics_report.get_html_metric_heading(table_name))
-        f.write(table_html)
+        # Name of the metric group in human readable form.
+        html_parts.append(metrics_report.get_html_metric_heading(table_name))
+        html_parts.append(table_html)
+
+    # Close HTML tags.
+    html_parts.append("</html>")
 
-        # Close HTML tags.
-        f.write("</html>")
+    with open(DASHBOARD_HTML_SAVE_FPATH, mode="w") as f:
+        f.write("".join(html_parts))
 
 
 if __name__ == "__main__":
@@ -2,7 +2,7 @@
 
 Authors: Ayush Baid, John Lambert
 """
-from typing import Tuple
+from typing import List, Tuple
 
 from dask.delayed import Delayed
 
@@ -12,13 +12,16 @@ from gtsfm.frontend.detector_descriptor.detector_descriptor_base import Detector
 class FeatureExtractor:
     """Wrapper for running detection and description on each image."""
 
-    def __init__(self, detector_descriptor: DetectorDescriptorBase) -> None:
+    def __init__(self, detector_descriptor: DetectorDescriptorBase, batch_size: int = 1) -> None:
         """Initializes the detector-descriptor
 
         Args:
             detector_descriptor: the joint detector-descriptor to use.
+            batch_size: number of images processed together by the detector-descriptor, when creating the graph for
+                all images at once.
         """
         self.detector_descriptor = detector_descriptor
+        self._batch_size = batch_size
 
     def create_computation_graph(self, image_graph: Delayed) -> Tuple[Delayed, Delayed]:
         """Given an image, create detection and descriptor generation tasks
@@ -31,3 +34,15 @@ class FeatureExtractor:
             Delayed object for corr. descriptors.
         """
         return self.detector_descriptor.create_computation_graph(image_graph)
+
+    def create_computation_graph_batch(self, image_graphs: List[Delayed]) -> Tuple[List[Delayed], List[Delayed]]:
+        """Given all images, create detection and descriptor generation tasks, for batches of `batch_size` images.
+
+        Args:
+            image_graphs: images wrapped up in Delayed
+
+        Returns:
+            Delayed objects for detected keypoints, one per image.
+            Delayed objects for corr. descriptors, one per image.
+        """
+        return self.detector_descriptor.create_computation_graph_batch(image_graphs, batch_size=self._batch_size)
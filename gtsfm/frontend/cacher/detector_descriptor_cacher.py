@@ -9,7 +9,7 @@ Example: To cache output of `SiftDetectorDescriptor`, use
 Authors: Ayush Baid
 """
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 import numpy as np
 
@@ -87,3 +87,26 @@ class DetectorDescriptorCacher(DetectorDescriptorBase):
         self.__save_result_to_cache(image, keypoints, descriptors)
 
         return keypoints, descriptors
+
+    def detect_and_describe_batch(self, images: List[Image]) -> List[Tuple[Keypoints, np.ndarray]]:
+        """Perform feature detection as well as their description on a batch of images, with caching.
+
+        Results in the cache are fetched, and the images with a cache miss are passed together to the
+        `detect_and_describe_batch` of the underlying object's API. Their results are cached.
+
+        Args:
+            images: the input images.
+
+        Returns:
+            Detected keypoints and corr. descriptors for each image, see detect_and_describe().
+        """
+        results = [self.__load_result_from_cache(image) for image in images]
+
+        missed_idxs = [i for i, cached_data in enumerate(results) if cached_data is None]
+        if len(missed_idxs) > 0:
+            missed_results = self._detector_descriptor.detect_and_describe_batch([images[i] for i in missed_idxs])
+            for i, (keypoints, descriptors) in zip(missed_idxs, missed_results):
+                self.__save_result_to_cache(images[i], keypoints, descriptors)
+                results[i] = (keypoints, descriptors)
+
+        return results
@@ -4,7 +4,7 @@ Authors: Ayush Baid
 """
 
 import abc
-from typing import Tuple
+from typing import List, Tuple
 
 import dask
 import numpy as np
@@ -46,6 +46,20 @@ class DetectorDescriptorBase(metaclass=abc.ABCMeta):
             Corr. descriptors, of shape (N, D) where D is the dimension of each descriptor.
         """
 
+    def detect_and_describe_batch(self, images: List[Image]) -> List[Tuple[Keypoints, np.ndarray]]:
+        """Perform feature detection as well as their description on a batch of images.
+
+        Runs detect_and_describe() on each image by default. Methods which can process several images at once (e.g. in
+        one forward pass of a network) should override it.
+
+        Args:
+            images: the input images.
+
+        Returns:
+            Detected keypoints and corr. descriptors for each image, see detect_and_describe().
+        """
+        return [self.detect_and_describe(image) for image in images]
+
     def create_computation_graph(self, image_graph: Delayed) -> Tuple[Delayed, Delayed]:
         """Generates the computation graph for detections and their descriptors.
 
@@ -59,3 +73,33 @@ class DetectorDescriptorBase(metaclass=abc.ABCMeta):
         keypoints_graph, descriptor_graph = dask.delayed(self.detect_and_describe, nout=2)(image_graph)
 
         return keypoints_graph, descriptor_graph
+
+    def create_computation_graph_batch(
+        self, image_graphs: List[Delayed], batch_size: int = 1
+    ) -> Tuple[List[Delayed], List[Delayed]]:
+        """Generates the computation graph for detections and their descriptors, for batches of images.
+
+        Args:
+            image_graphs: computation graphs for the images (from a loader).
+            batch_size: number of images processed in one detect_and_describe_batch() task.
+
+        Returns:
+            Delayed tasks for detections, one per image.
+            Delayed tasks for corr. descriptors, one per image.
+        """
+        if batch_size == 1:
+            graphs = [self.create_computation_graph(image_graph) for image_graph in image_graphs]
+            return [graph[0] for graph in graphs], [graph[1] for graph in graphs]
+
+        keypoints_graphs = []
+        descriptors_graphs = []
+        for start_idx in range(0, len(image_graphs), batch_size):
+            batch_image_graphs = image_graphs[start_idx : start_idx + batch_size]
+            batch_graph = dask.delayed(self.detect_and_describe_batch, nout=len(batch_image_graphs))(
+                batch_image_graphs
+            )
+            for image_result_graph in batch_graph:
+                keypoints_graphs.append(image_result_graph[0])
+                descriptors_graphs.append(image_result_graph[1])
+
+        return keypoints_graphs, descriptors_graphs
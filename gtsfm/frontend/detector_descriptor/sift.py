@@ -53,6 +53,8 @@ class SIFTDetectorDescriptor(DetectorDescriptorBase):
 
         # Filter features.
         keypoints, selection_idxs = keypoints.get_top_k(self.max_keypoints)
-        descriptors = descriptors[selection_idxs]
+        # All keypoints are kept in order if there are at most max_keypoints, in which case the gather is skipped.
+        if len(selection_idxs) < len(descriptors):
+            descriptors = descriptors[selection_idxs]
 
         return keypoints, descriptors
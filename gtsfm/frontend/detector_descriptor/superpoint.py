@@ -9,8 +9,9 @@ References:
 
 Authors: Ayush Baid
 """
+from collections import defaultdict
 from pathlib import Path
-from typing import Tuple, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 import torch
@@ -46,29 +47,54 @@ class SuperPointDetectorDescriptor(DetectorDescriptorBase):
 
     def detect_and_describe(self, image: Image) -> Tuple[Keypoints, np.ndarray]:
         """Jointly generate keypoint detections and their associated descriptors from a single image."""
+        return self.detect_and_describe_batch([image])[0]
+
+    def detect_and_describe_batch(self, images: List[Image]) -> List[Tuple[Keypoints, np.ndarray]]:
+        """Jointly generate keypoint detections and their associated descriptors from a batch of images.
+
+        The model is loaded once for the batch, and images of the same shape go through the network together.
+        """
         # TODO(ayushbaid): fix inference issue #110
         device = torch.device("cuda" if self._use_cuda else "cpu")
         model = SuperPoint(self._config).to(device)
         model.eval()
 
-        # Compute features.
-        image_tensor = torch.from_numpy(
-            np.expand_dims(image_utils.rgb_to_gray_cv(image).value_array.astype(np.float32) / 255.0, (0, 1))
-        ).to(device)
-        with torch.no_grad():
-            model_results = model({"image": image_tensor})
+        image_idxs_per_shape: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, image in enumerate(images):
+            image_idxs_per_shape[(image.height, image.width)].append(i)
+
+        results = [None] * len(images)
+        for image_idxs in image_idxs_per_shape.values():
+            # Compute features.
+            image_tensor = torch.from_numpy(
+                np.stack(
+                    [image_utils.rgb_to_gray_cv(images[i]).value_array.astype(np.float32) / 255.0 for i in image_idxs]
+                )[:, np.newaxis]
+            ).to(device)
+            with torch.no_grad():
+                model_results = model({"image": image_tensor})
+
+            for batch_idx, i in enumerate(image_idxs):
+                results[i] = self.__unpack_results(model_results, batch_idx, images[i])
         torch.cuda.empty_cache()
 
-        # Unpack results.
-        coordinates = model_results["keypoints"][0].detach().cpu().numpy()
-        scores = model_results["scores"][0].detach().cpu().numpy()
+        return results
+
+    def __unpack_results(
+        self, model_results: Dict[str, List[torch.Tensor]], batch_idx: int, image: Image
+    ) -> Tuple[Keypoints, np.ndarray]:
+        """Converts the network outputs for one image of the batch to keypoints and descriptors, and filters them."""
+        coordinates = model_results["keypoints"][batch_idx].detach().cpu().numpy()
+        scores = model_results["scores"][batch_idx].detach().cpu().numpy()
         keypoints = Keypoints(coordinates, scales=None, responses=scores)
-        descriptors = model_results["descriptors"][0].detach().cpu().numpy().T
+        descriptors = model_results["descriptors"][batch_idx].detach().cpu().numpy().T
 
         # Filter features.
         if image.mask is not None:
             keypoints, valid_idxs = keypoints.filter_by_mask(image.mask)
-            descriptors = descriptors[valid_idxs]
+            # The descriptors are gathered below anyway, so they are only gathered here if some keypoints were masked.
+            if len(valid_idxs) < len(descriptors):
+                descriptors = descriptors[valid_idxs]
         keypoints, selection_idxs = keypoints.get_top_k(self.max_keypoints)
         descriptors = descriptors[selection_idxs]
 
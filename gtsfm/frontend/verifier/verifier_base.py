@@ -94,13 +94,8 @@ class VerifierBase(metaclass=abc.ABCMeta):
             Delayed dask task for indices of verified correspondence indices for the specific image pair.
             Delayed dask task for inlier ratio w.r.t. the estimated model, i.e. #final RANSAC inliers/ #putatives.
         """
-        # we cannot immediately unpack the result tuple, per dask syntax
-        result = dask.delayed(self.verify)(
+        i2Ri1_graph, i2Ui1_graph, v_corr_idxs_graph, inlier_ratio_est_model = dask.delayed(self.verify, nout=4)(
             keypoints_i1_graph, keypoints_i2_graph, matches_i1i2_graph, intrinsics_i1_graph, intrinsics_i2_graph
         )
-        i2Ri1_graph = result[0]
-        i2Ui1_graph = result[1]
-        v_corr_idxs_graph = result[2]
-        inlier_ratio_est_model = result[3]
 
         return i2Ri1_graph, i2Ui1_graph, v_corr_idxs_graph, inlier_ratio_est_model
@@ -121,12 +121,7 @@ class SceneOptimizer:
         """The SceneOptimizer plate calls the FeatureExtractor and TwoViewEstimator plates several times."""
 
         # detection and description graph
-        delayed_keypoints = []
-        delayed_descriptors = []
-        for delayed_image in image_graph:
-            (delayed_dets, delayed_descs) = self.feature_extractor.create_computation_graph(delayed_image)
-            delayed_keypoints += [delayed_dets]
-            delayed_descriptors += [delayed_descs]
+        delayed_keypoints, delayed_descriptors = self.feature_extractor.create_computation_graph_batch(image_graph)
 
         # Estimate two-view geometry and get indices of verified correspondences.
         i2Ri1_graph_dict = {}
@@ -177,12 +172,7 @@ class SceneOptimizer:
         delayed_results = []
 
         # detection and description graph
-        delayed_keypoints = []
-        delayed_descriptors = []
-        for delayed_image in image_graph:
-            (delayed_dets, delayed_descs) = self.feature_extractor.create_computation_graph(delayed_image)
-            delayed_keypoints += [delayed_dets]
-            delayed_descriptors += [delayed_descs]
+        delayed_keypoints, delayed_descriptors = self.feature_extractor.create_computation_graph_batch(image_graph)
 
         # Estimate two-view geometry and get indices of verified correspondences.
         i2Ri1_graph_dict = {}
@@ -25,18 +25,17 @@ def get_ortho_axis_alignment_transform(gtsfm_data: GtsfmData) -> Pose3:
         The final transformation required to align point cloud and frustums.
     """
     # Iterate through each track to gather a list of 3D points forming the point cloud.
-    num_pts = gtsfm_data.number_tracks()
-    point_cloud = [gtsfm_data.get_track(j).point3() for j in range(num_pts)]
-    point_cloud = np.array(point_cloud)  # point_cloud has shape Nx3
+    point_cloud = np.array([track.point3() for track in gtsfm_data.get_tracks()])  # point_cloud has shape Nx3
 
     # Filter outlier points, Center point cloud, and obtain alignment rotation.
-    points_filtered, inlier_mask = remove_outlier_points(point_cloud)
-    points_centered = center_point_cloud(points_filtered)
-    wuprightRw = get_alignment_rotation_matrix_from_svd(points_centered)
+    points_filtered, _ = remove_outlier_points(point_cloud)
+    # points_filtered is a new array from boolean indexing, so it can be centered in place.
+    points_filtered, mean = center_point_cloud(points_filtered, copy=False)
+    wuprightRw = get_alignment_rotation_matrix_from_svd(points_filtered)
 
-    # Calculate translation vector based off rotated point cloud (excluding outliers).
-    point_cloud_rotated = point_cloud @ wuprightRw.T
-    rotated_mean = np.mean(point_cloud_rotated[inlier_mask], axis=0)
+    # Calculate translation vector based off rotated point cloud (excluding outliers). The mean of the rotated points is
+    # the rotated mean, so the point cloud does not need to be rotated.
+    rotated_mean = wuprightRw @ mean
 
     # Obtain the Pose3 object needed to align camera frustums.
     walignedTw = Pose3(Rot3(wuprightRw), -1 * rotated_mean)
@@ -44,14 +43,17 @@ def get_ortho_axis_alignment_transform(gtsfm_data: GtsfmData) -> Pose3:
     return walignedTw
 
 
-def center_point_cloud(point_cloud: np.ndarray) -> np.ndarray:
+def center_point_cloud(point_cloud: np.ndarray, copy: bool = True) -> Tuple[np.ndarray, np.ndarray]:
     """Centers a point cloud using mean values of x, y, and z.
 
     Args:
         point_cloud: array of shape (N,3) representing the original point cloud.
+        copy: whether to return the centered point cloud as a new array. If False, a floating point point_cloud is
+            centered in place and returned, avoiding an (N,3) allocation.
 
     Returns:
         points_centered: array of shape (N,3) representing the centered point cloud
+        mean: array of shape (3,) representing the mean of the original point cloud.
 
     Raises:
         TypeError: if point_cloud is not of shape (N,3).
@@ -60,8 +62,11 @@ def center_point_cloud(point_cloud: np.ndarray) -> np.ndarray:
         raise TypeError("Points list should be 3D")
 
     mean = np.mean(point_cloud, axis=0)
-    points_centered = point_cloud - mean
-    return points_centered
+    if copy:
+        return point_cloud - mean, mean
+
+    np.subtract(point_cloud, mean, out=point_cloud)
+    return point_cloud, mean
 
 
 def remove_outlier_points(point_cloud: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
@@ -80,9 +85,10 @@ def remove_outlier_points(point_cloud: np.ndarray) -> Tuple[np.ndarray, np.ndarr
     if point_cloud.shape[1] != 3:
         raise TypeError("Point Cloud should be 3 dimensional")
 
-    mags = np.linalg.norm(point_cloud, axis=1)
-    cutoff_mag = np.percentile(mags, OUTLIER_DISTANCE_PERCENTILE)
-    inlier_mask = mags < cutoff_mag
+    # Squared magnitudes select the same points, since the percentile interpolates between the same two points.
+    sq_mags = np.einsum("ij,ij->i", point_cloud, point_cloud)
+    cutoff_sq_mag = np.percentile(sq_mags, OUTLIER_DISTANCE_PERCENTILE)
+    inlier_mask = sq_mags < cutoff_sq_mag
     points_filtered = point_cloud[inlier_mask]
     return points_filtered, inlier_mask
 
@@ -118,8 +124,8 @@ def get_alignment_rotation_matrix_from_svd(point_cloud: np.ndarray) -> np.ndarra
 
 
 def get_right_singular_vectors(A: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-    """Extracts the right singular eigenvectors from the point cloud. Some of the eigenvectors could be randomly
-    multiplied by -1. Despite this, the eigenvectors will still remain valid.
+    """Extracts the right singular eigenvectors from the point cloud. The sign of each eigenvector is chosen such that
+    its component with the largest magnitude is positive.
 
     Ref: https://stackoverflow.com/questions/18152052/matlab-eig-returns-inverted-signs-sometimes
 
@@ -137,12 +143,16 @@ def get_right_singular_vectors(A: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     if D != 3:
         raise TypeError("Point Cloud should be 3 dimesional")
 
-    # eigenvectors of A^T*A are singular vectors of A
-    # we apply Bessel's correction when estimating the covariance matrix
-    # See https://en.wikipedia.org/wiki/Principal_component_analysis#Computing_PCA_using_the_covariance_method
-    eigvals, eigvecs = np.linalg.eig(A.T @ A / (N - 1))
+    # The right singular vectors of A are the eigenvectors of A^T*A, but are computed with an SVD of A directly, which
+    # avoids squaring the condition number. The singular values are returned in descending order.
+    _, singular_values, Vt = np.linalg.svd(A, full_matrices=False)
+    V = Vt.T
 
-    # Sort eigenvectors such that they correspond to eigenvalues sorted in descending order.
-    sort_idxs = np.argsort(-eigvals)
+    # Flip the sign of each singular vector, such that its largest component is positive, for a deterministic output.
+    max_component_idxs = np.argmax(np.abs(V), axis=0)
+    V = V * np.sign(V[max_component_idxs, np.arange(D)])
 
-    return eigvecs[:, sort_idxs], np.sqrt(eigvals[sort_idxs])
+    # we apply Bessel's correction when estimating the covariance matrix, i.e. these are the square roots of the
+    # eigenvalues of A^T*A / (N-1).
+    # See https://en.wikipedia.org/wiki/Principal_component_analysis#Computing_PCA_using_the_covariance_method
+    return V, singular_values / np.sqrt(N - 1)
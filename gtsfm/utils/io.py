@@ -32,6 +32,12 @@ from gtsfm.common.gtsfm_data import GtsfmData
 from gtsfm.common.image import Image
 from gtsfm.common.sfm_track import SfmTrack2d
 
+try:
+    # orjson is an optional, faster drop-in for json.loads
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logger_utils.get_logger()
 
 
@@ -122,8 +128,17 @@ def read_json_file(fpath: Union[str, Path]) -> Any:
     Returns:
         Deserialized Python dictionary or list.
     """
-    with open(fpath, "r") as f:
-        return json.load(f)
+    if orjson is None:
+        with open(fpath, "r") as f:
+            return json.load(f)
+
+    with open(fpath, "rb") as f:
+        data = f.read()
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson rejects the non-standard NaN and Infinity literals that json.dump() writes, e.g. for empty metrics
+        return json.loads(data)
 
 
 def read_bal(file_path: str) -> GtsfmData:
@@ -408,8 +423,6 @@ def read_points_txt(fpath: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarr
     with open(fpath, "r") as f:
         data = f.readlines()
 
-    rgb = []
-    point_cloud = []
     # first 3 lines are information about the file format
     # line at index 2 will be of the form
     # "# Number of points: 2122, mean track length: 2.8449575871819039"
@@ -418,17 +431,12 @@ def read_points_txt(fpath: str) -> Tuple[Optional[np.ndarray], Optional[np.ndarr
     k = points_metadata.find(",")
     expected_num_pts = int(points_metadata[j + 1 : k])
 
-    data = data[3:]
-    for line in data:
-        entries = line.split()
-        x, y, z, r, g, b = entries[1:7]
-
-        point = [float(x), float(y), float(z)]
-        point_cloud += [point]
-        rgb += [(int(r), int(g), int(b))]
+    # each line has the form "POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)". Only
+    # (X, Y, Z, R, G, B) are kept, and all of them are converted from text by numpy in a single call.
+    xyz_rgb = np.array([line.split()[1:7] for line in data[3:]], dtype=np.float64).reshape(-1, 6)
 
-    point_cloud = np.array(point_cloud)
-    rgb = np.array(rgb).astype(np.uint8)
+    point_cloud = xyz_rgb[:, :3]
+    rgb = xyz_rgb[:, 3:].astype(np.uint8)
 
     assert point_cloud.shape[0] == expected_num_pts
     assert rgb.shape[0] == expected_num_pts
@@ -167,9 +167,8 @@ def plot_sfm_data_3d(sfm_data: GtsfmData, ax: Axes, max_plot_radius: float = 50)
     camera_poses = [sfm_data.get_camera(i).pose() for i in sfm_data.get_valid_camera_indices()]
     plot_poses_3d(camera_poses, ax)
 
-    num_tracks = sfm_data.number_tracks()
     # Restrict 3d points to some radius of camera poses
-    points_3d = np.array([list(sfm_data.get_track(j).point3()) for j in range(num_tracks)])
+    points_3d = np.array([track.point3() for track in sfm_data.get_tracks()])
 
     nearby_points_3d = comp_utils.get_points_within_radius_of_cameras(camera_poses, points_3d, max_plot_radius)
 
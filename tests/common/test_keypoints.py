@@ -128,6 +128,20 @@ class TestKeypoints(unittest.TestCase):
         # compare in an order-insensitive fashion
         self.compare_without_ordering(computed, expected)
 
+    def test_get_top_k_indices_with_responses(self):
+        """Tests the indices selected for the top entries with responses, including an empty selection."""
+
+        input_keypoints = Keypoints(coordinates=np.random.rand(5, 2), responses=np.array([0.3, 0.7, 0.9, 0.1, 0.2]))
+
+        computed, selection_idxs = input_keypoints.get_top_k(0)
+        self.assertEqual(len(computed), 0)
+        self.assertEqual(len(selection_idxs), 0)
+
+        for k in range(1, len(input_keypoints)):
+            computed, selection_idxs = input_keypoints.get_top_k(k)
+            self.assertEqual(len(computed), k)
+            self.assertCountEqual(selection_idxs.tolist(), [2, 1, 0, 4, 3][:k])
+
     def test_get_top_k_without_responses(self):
         """Tests the selection of top entries in a keypoints w/o responses."""
 
@@ -15,6 +15,7 @@ from gtsam import Cal3Bundler, PinholeCameraCal3Bundler, Point2Vector, Point3, P
 from gtsam.utils.test_case import GtsamTestCase
 
 from gtsfm.common.keypoints import Keypoints
+import gtsfm.data_association.data_assoc as data_assoc
 from gtsfm.data_association.data_assoc import DataAssociation
 from gtsfm.data_association.point3d_initializer import TriangulationOptions, TriangulationSamplingMode
 
@@ -332,6 +333,19 @@ class TestDataAssociation(GtsamTestCase):
         for i in expected_sfm_data.get_valid_camera_indices():
             self.gtsamAssertEquals(expected_sfm_data.get_camera(i), cameras.get(i))
 
+    def test_split_into_chunks(self):
+        """Checks that chunks are consecutive, cover all tracks, and that the number of chunks is fixed."""
+        tracks = list(range(10))
+
+        chunks = data_assoc.split_into_chunks(tracks, num_chunks=4)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual([track for chunk in chunks for track in chunk], tracks)
+
+        # more chunks than tracks results in empty chunks
+        chunks = data_assoc.split_into_chunks(tracks[:2], num_chunks=4)
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual([track for chunk in chunks for track in chunk], tracks[:2])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -253,6 +253,57 @@ class TestPoint3dInitializer(unittest.TestCase):
                 # assert we have failures which are already expected
                 self.assertIn(track_2d, expected_failures)
 
+    def testTriangulateBatch(self):
+        """Check that batched triangulation matches per-track triangulation."""
+        tracks = [SfmTrack2d(MEASUREMENTS), SfmTrack2d(MEASUREMENTS[:2]), SfmTrack2d(MEASUREMENTS[:1])]
+
+        batch_results = self.simple_triangulation_initializer.triangulate_batch(tracks)
+        self.assertEqual(len(batch_results), len(tracks))
+
+        for track_2d, (sfm_track, avg_error, exit_code) in zip(tracks, batch_results):
+            expected_track, expected_avg_error, expected_exit_code = self.simple_triangulation_initializer.triangulate(
+                track_2d
+            )
+            self.assertEqual(exit_code, expected_exit_code)
+            if expected_avg_error is None:
+                self.assertIsNone(avg_error)
+            else:
+                self.assertAlmostEqual(avg_error, expected_avg_error)
+            if expected_track is None:
+                self.assertIsNone(sfm_track)
+            else:
+                np.testing.assert_allclose(sfm_track.point3(), expected_track.point3(), atol=1e-6)
+
+    def testTriangulateBatchTwoViewTracks(self):
+        """Check that closed-form 2-view triangulation matches per-track triangulation, incl. the failure modes."""
+        outlier_measurements = get_track_with_one_outlier()
+        tracks = [SfmTrack2d([MEASUREMENTS[i], MEASUREMENTS[j]]) for i, j in [(0, 1), (2, 5), (3, 7)]]
+        tracks.append(SfmTrack2d([outlier_measurements[4], outlier_measurements[5]]))
+
+        for obj in [self.simple_triangulation_initializer, self.ransac_uniform_sampling_initializer]:
+            batch_results = obj.triangulate_batch(tracks)
+            for track_2d, (sfm_track, _, exit_code) in zip(tracks, batch_results):
+                expected_track, _, expected_exit_code = obj.triangulate(track_2d)
+                self.assertEqual(exit_code, expected_exit_code)
+                if expected_track is None:
+                    self.assertIsNone(sfm_track)
+                else:
+                    np.testing.assert_allclose(sfm_track.point3(), expected_track.point3(), atol=1e-6)
+
+    def testTriangulateTwoViewBatchCheirality(self):
+        """Check that 2-view tracks seen from flipped cameras fail the cheirality check."""
+        yaw = np.pi
+        camera_flip_pose = Pose3(Rot3.RzRyRx(yaw, 0, 0), np.zeros((3, 1)))
+        flipped_cameras = {
+            i: PinholeCameraCal3Bundler(cam.pose().compose(camera_flip_pose), cam.calibration())
+            for i, cam in CAMERAS.items()
+        }
+        obj = Point3dInitializer(flipped_cameras, self.simple_triangulation_initializer.options)
+
+        sfm_track, _, exit_code = obj.triangulate_batch([SfmTrack2d(MEASUREMENTS[:2])])[0]
+        self.assertIsNone(sfm_track)
+        self.assertEqual(exit_code, obj.triangulate(SfmTrack2d(MEASUREMENTS[:2]))[2])
+
 
 class TestPoint3dInitializerUnestimatedCameras(unittest.TestCase):
     """Unit tests for Point3dInitializer when a camera pose could not be estimated."""
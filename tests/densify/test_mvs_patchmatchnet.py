@@ -19,6 +19,7 @@ from gtsfm.common.image import Image
 from gtsfm.common.gtsfm_data import GtsfmData, SfmTrack
 from gtsfm.densify.mvs_patchmatchnet import MVSPatchmatchNet, compute_filtered_reprojection_error
 from gtsfm.densify.patchmatchnet_data import PatchmatchNetData
+import thirdparty.patchmatchnet.eval as patchmatchnet_eval
 
 
 # set dummy random seed
@@ -187,5 +188,43 @@ class TestMVSPatchmatchNet(unittest.TestCase):
         self.assertAlmostEqual(reproject_errors[0], 0.998, 3)
 
 
+class TestGeometricConsistencyTorch(unittest.TestCase):
+    """Unit tests for the PyTorch version of the geometric consistency check."""
+
+    def test_check_geometric_consistency_torch(self) -> None:
+        """Check that the PyTorch version agrees with the NumPy/OpenCV version on a smooth depth map."""
+        K = CAMERA_INTRINSICS.K()
+        ref_extrinsics = CAMERAS[0].pose().inverse().matrix()
+        src_extrinsics = CAMERAS[1].pose().inverse().matrix()
+
+        # a slanted plane, so that depths vary smoothly over the image
+        x, y = np.meshgrid(np.arange(IMAGE_W), np.arange(IMAGE_H))
+        ref_depth = (40.0 + 0.01 * x + 0.02 * y).astype(np.float32)
+        src_depth = (40.0 + 0.02 * x + 0.01 * y).astype(np.float32)
+
+        expected_mask, expected_depth, _, _ = patchmatchnet_eval.check_geometric_consistency(
+            ref_depth, K, ref_extrinsics, src_depth, K, src_extrinsics, geo_pixel_thres=1.0, geo_depth_thres=0.01
+        )
+        mask, depth_reprojected, x_src, y_src = patchmatchnet_eval.check_geometric_consistency_torch(
+            torch.from_numpy(ref_depth),
+            K,
+            ref_extrinsics,
+            torch.from_numpy(src_depth),
+            K,
+            src_extrinsics,
+            geo_pixel_thres=1.0,
+            geo_depth_thres=0.01,
+        )
+        mask, depth_reprojected, x_src, y_src = mask.numpy(), depth_reprojected.numpy(), x_src.numpy(), y_src.numpy()
+
+        # cv2.remap quantizes sampling locations and handles the image border differently from grid_sample,
+        #   so only a few pixels may disagree, and depths are compared where the source view is sampled inside the image
+        self.assertGreater((mask == expected_mask).mean(), 0.99)
+        inside = (x_src > 1) & (x_src < IMAGE_W - 2) & (y_src > 1) & (y_src < IMAGE_H - 2)
+        valid = mask & expected_mask & inside
+        self.assertGreater(valid.sum(), 0)
+        np.testing.assert_allclose(depth_reprojected[valid], expected_depth[valid], rtol=1e-3)
+
+
 if __name__ == "__main__":
     unittest.main()
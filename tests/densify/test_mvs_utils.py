@@ -86,6 +86,27 @@ class TestMVSUtils(unittest.TestCase):
         )
         self.assertTrue(np.allclose(computed, expected))
 
+    def test_calculate_triangulation_angles_in_degrees_batch(self) -> None:
+        """Test that the batched triangulation angles, with a camera pair per point, match the single-point version."""
+        rng = np.random.default_rng(0)
+        camera_centers_1 = rng.uniform(-10, 10, size=(5, 3))
+        camera_centers_2 = rng.uniform(-10, 10, size=(5, 3))
+        points_3d = rng.uniform(-10, 10, size=(5, 3))
+
+        computed = mvs_utils.calculate_triangulation_angles_in_degrees_batch(
+            camera_centers_1=camera_centers_1, camera_centers_2=camera_centers_2, points_3d=points_3d
+        )
+
+        expected = [
+            mvs_utils.calculate_triangulation_angle_in_degrees(
+                camera_1=PinholeCameraCal3Bundler(Pose3(Rot3(), c1)),
+                camera_2=PinholeCameraCal3Bundler(Pose3(Rot3(), c2)),
+                point_3d=x,
+            )
+            for c1, c2, x in zip(camera_centers_1, camera_centers_2, points_3d)
+        ]
+        np.testing.assert_allclose(computed, expected)
+
     def test_piecewise_gaussian_below_expect_baseline_angle(self) -> None:
         """Unit test for the case that the angle between two coordinates is below the expect baseline angle,
         where sigma_1 is used to calculate the score"""
@@ -102,6 +123,16 @@ class TestMVSUtils(unittest.TestCase):
 
         self.assertAlmostEqual(score, np.exp(-(5.0 ** 2) / (2 * 10.0 ** 2)))
 
+    def test_piecewise_gaussian_batch(self) -> None:
+        """Unit test that the vectorized piecewise Gaussian matches the scalar version on both sides of theta_0."""
+
+        thetas = np.array([0.0, 4.0, 5.0, 10.0, 45.0])
+
+        scores = mvs_utils.piecewise_gaussian_batch(thetas=thetas, theta_0=5, sigma_1=1, sigma_2=10)
+
+        expected = [mvs_utils.piecewise_gaussian(theta=t, theta_0=5, sigma_1=1, sigma_2=10) for t in thetas]
+        np.testing.assert_allclose(scores, expected)
+
     def test_cart_to_homogenous(self) -> None:
         """Test the cart_to_homogenous function correctly produces the homogenous coordinates"""
 
@@ -83,6 +83,48 @@ class TestDetectorDescriptorCacher(unittest.TestCase):
         read_mock.assert_called_once_with(cache_path)
         write_mock.assert_not_called()
 
+    @patch("gtsfm.utils.cache.generate_hash_for_image", return_value="img_key")
+    @patch(
+        "gtsfm.utils.io.read_from_bz2_file",
+        side_effect=[{"keypoints": DUMMY_KEYPOINTS, "descriptors": DUMMY_DESCRIPTORS}, None],
+    )
+    @patch("gtsfm.utils.io.write_to_bz2_file")
+    def test_batch_with_cache_hit_and_miss(
+        self, write_mock: MagicMock, read_mock: MagicMock, generate_hash_for_image_mock: MagicMock
+    ) -> None:
+        """Test that only the images with a cache miss in a batch are passed to the underlying object."""
+
+        missed_keypoints = Keypoints(coordinates=np.random.rand(5, 2))
+        missed_descriptors = np.random.rand(len(missed_keypoints), 128)
+        missed_image = Image(value_array=np.random.randint(low=0, high=255, size=(100, 120, 3)))
+
+        # mock the underlying detector-descriptor which is used on cache miss
+        underlying_detector_descriptor_mock = MagicMock()
+        underlying_detector_descriptor_mock.detect_and_describe_batch.return_value = [
+            (missed_keypoints, missed_descriptors)
+        ]
+        underlying_detector_descriptor_mock.__class__.__name__ = "mock_det_desc"
+        obj_under_test = DetectorDescriptorCacher(detector_descriptor_obj=underlying_detector_descriptor_mock)
+
+        results = obj_under_test.detect_and_describe_batch(images=[DUMMY_IMAGE, missed_image])
+
+        # assert the returned values, in the order of the input images
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][0], DUMMY_KEYPOINTS)
+        np.testing.assert_allclose(results[0][1], DUMMY_DESCRIPTORS)
+        self.assertEqual(results[1][0], missed_keypoints)
+        np.testing.assert_allclose(results[1][1], missed_descriptors)
+
+        # assert that underlying object was called once, only with the missed image
+        underlying_detector_descriptor_mock.detect_and_describe_batch.assert_called_once_with([missed_image])
+
+        # assert that only the result of the missed image was written to the cache
+        cache_path = ROOT_PATH / "cache" / "detector_descriptor" / "mock_det_desc_img_key.pbz2"
+        self.assertEqual(read_mock.call_count, 2)
+        write_mock.assert_called_once_with(
+            {"keypoints": missed_keypoints, "descriptors": missed_descriptors}, cache_path
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
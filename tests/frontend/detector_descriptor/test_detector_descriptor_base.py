@@ -74,6 +74,22 @@ class TestDetectorDescriptorBase(test_detector_base.TestDetectorBase):
                 self.assertEqual(keypoints, expected_kps)
                 np.testing.assert_array_equal(descriptors, expected_descs)
 
+    def test_computation_graph_batch(self):
+        """Test that the batched computation graph gives the same results as processing each image."""
+
+        image_graphs = self.loader.create_computation_graph_for_images()
+        kp_graphs, desc_graphs = self.detector_descriptor.create_computation_graph_batch(image_graphs, batch_size=3)
+        self.assertEqual(len(kp_graphs), len(image_graphs))
+        self.assertEqual(len(desc_graphs), len(image_graphs))
+
+        with dask.config.set(scheduler="single-threaded"):
+            keypoints_list, descriptors_list = dask.compute(kp_graphs, desc_graphs)
+
+        for i, (keypoints, descriptors) in enumerate(zip(keypoints_list, descriptors_list)):
+            expected_kps, expected_descs = self.detector_descriptor.detect_and_describe(self.loader.get_image(i))
+            self.assertEqual(keypoints, expected_kps)
+            np.testing.assert_array_equal(descriptors, expected_descs)
+
 
 if __name__ == "__main__":
     unittest.main()
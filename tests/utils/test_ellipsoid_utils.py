@@ -176,9 +176,18 @@ class TestEllipsoidUtils(unittest.TestCase):
             (3,3,3) -> (1,1,1)
         """
         sample_points = np.array([[1, 1, 1], [2, 2, 2], [3, 3, 3]])
-        computed = ellipsoid_utils.center_point_cloud(sample_points)
+        computed, mean = ellipsoid_utils.center_point_cloud(sample_points)
         expected = np.array([[-1, -1, -1], [0, 0, 0], [1, 1, 1]])
         npt.assert_almost_equal(computed, expected, decimal=3)
+        npt.assert_almost_equal(mean, np.array([2, 2, 2]), decimal=3)
+
+    def test_center_point_cloud_in_place(self) -> None:
+        """Tests that center_point_cloud() with copy=False centers the input array itself."""
+        sample_points = np.array([[1, 1, 1], [2, 2, 2], [3, 3, 3]], dtype=np.float64)
+        computed, _ = ellipsoid_utils.center_point_cloud(sample_points, copy=False)
+        expected = np.array([[-1, -1, -1], [0, 0, 0], [1, 1, 1]])
+        self.assertIs(computed, sample_points)
+        npt.assert_almost_equal(sample_points, expected, decimal=3)
 
     def test_center_point_cloud_wrong_dims(self) -> None:
         """Tests the center_point_cloud() function with 5 sample points of 2 dimensions."""
@@ -2,10 +2,50 @@
     reference: https://github.com/FangjinhuaWang/PatchmatchNet
 
 """
-from typing import Tuple
+from functools import lru_cache
+from typing import Optional, Tuple
 
 import cv2
 import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+@lru_cache(maxsize=4)
+def pixel_grid(height: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Get the x and y pixel coordinates of an image, cached since all depth maps share the same resolution.
+
+    Args:
+        height: height of the image
+        width: width of the image
+
+    Returns:
+        x and y float32 coordinates of all pixels, each of shape (H, W). The arrays are read-only as they are shared.
+    """
+    x, y = np.meshgrid(np.arange(0, width, dtype=np.float32), np.arange(0, height, dtype=np.float32))
+    x.flags.writeable = False
+    y.flags.writeable = False
+    return x, y
+
+
+@lru_cache(maxsize=4)
+def homogeneous_pixel_grid(height: int, width: int) -> np.ndarray:
+    """Get the homogeneous pixel coordinates of an image, cached like pixel_grid().
+
+    Args:
+        height: height of the image
+        width: width of the image
+
+    Returns:
+        float32 array of shape (3, H*W), with rows x, y and 1 of all pixels in row-major order. The array is read-only.
+    """
+    x, y = pixel_grid(height, width)
+    pixels_h = np.empty((3, height * width), dtype=np.float32)
+    pixels_h[0] = x.ravel()
+    pixels_h[1] = y.ravel()
+    pixels_h[2] = 1.0
+    pixels_h.flags.writeable = False
+    return pixels_h
 
 
 def reproject_with_depth(
@@ -15,6 +55,10 @@ def reproject_with_depth(
     depth_src: np.ndarray,
     intrinsics_src: np.ndarray,
     extrinsics_src: np.ndarray,
+    intrinsics_ref_inv: Optional[np.ndarray] = None,
+    extrinsics_ref_inv: Optional[np.ndarray] = None,
+    intrinsics_src_inv: Optional[np.ndarray] = None,
+    extrinsics_src_inv: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Project the reference points to the source view, then project back to calculate the reprojection error
 
@@ -25,6 +69,10 @@ def reproject_with_depth(
         depth_src: depths of points in the source view, of shape (H, W)
         intrinsics_src: camera intrinsic of the source view, of shape (3, 3)
         extrinsics_src: camera extrinsic of the source view, of shape (4, 4)
+        intrinsics_ref_inv: optional precomputed inverse of intrinsics_ref, of shape (3, 3)
+        extrinsics_ref_inv: optional precomputed inverse of extrinsics_ref, of shape (4, 4)
+        intrinsics_src_inv: optional precomputed inverse of intrinsics_src, of shape (3, 3)
+        extrinsics_src_inv: optional precomputed inverse of extrinsics_src, of shape (4, 4)
 
     Returns:
         A tuble contains
@@ -34,44 +82,52 @@ def reproject_with_depth(
             x_src: x coordinates of points in the source view, of shape (H, W)
             y_src: y coordinates of points in the source view, of shape (H, W)
     """
+    if intrinsics_ref_inv is None:
+        intrinsics_ref_inv = np.linalg.inv(intrinsics_ref)
+    if extrinsics_ref_inv is None:
+        extrinsics_ref_inv = np.linalg.inv(extrinsics_ref)
+    if intrinsics_src_inv is None:
+        intrinsics_src_inv = np.linalg.inv(intrinsics_src)
+    if extrinsics_src_inv is None:
+        extrinsics_src_inv = np.linalg.inv(extrinsics_src)
+
+    # relative poses between the two camera frames
+    src_T_ref = np.matmul(extrinsics_src, extrinsics_ref_inv)
+    ref_T_src = np.matmul(extrinsics_ref, extrinsics_src_inv)
+
     width, height = depth_ref.shape[1], depth_ref.shape[0]
     # step1. project reference pixels to the source view
-    # reference view x, y
-    x_ref, y_ref = np.meshgrid(np.arange(0, width), np.arange(0, height))
-    x_ref, y_ref = x_ref.reshape([-1]), y_ref.reshape([-1])
-    # reference 3D space
-    xyz_ref = np.matmul(
-        np.linalg.inv(intrinsics_ref), np.vstack((x_ref, y_ref, np.ones_like(x_ref))) * depth_ref.reshape([-1])
-    )
-    # source 3D space
-    xyz_src = np.matmul(
-        np.matmul(extrinsics_src, np.linalg.inv(extrinsics_ref)), np.vstack((xyz_ref, np.ones_like(x_ref)))
-    )[:3]
-    # source view x, y
-    K_xyz_src = np.matmul(intrinsics_src, xyz_src)
-    xy_src = K_xyz_src[:2] / K_xyz_src[2:3]
+    # source view x, y: K_src @ (R @ K_ref^-1 @ (depth * p_ref) + t) is fused into one 3x3 map plus a translation term.
+    #   The (small) matrices are cast to float32, so the per-pixel arithmetic stays in float32 as cv2.remap expects.
+    #   The depth is a per-pixel scale, so it is applied in place after the matmul with the cached homogeneous pixels
+    H_src_ref = np.matmul(intrinsics_src, np.matmul(src_T_ref[:3, :3], intrinsics_ref_inv)).astype(np.float32)
+    K_xyz_src = np.matmul(H_src_ref, homogeneous_pixel_grid(height, width))
+    K_xyz_src *= depth_ref.reshape([-1])
+    K_xyz_src += np.matmul(intrinsics_src, src_T_ref[:3, 3:4]).astype(np.float32)
+    K_xyz_src[:2] /= K_xyz_src[2:3]
+    xy_src = K_xyz_src[:2]
 
     # step2. reproject the source view points with source view depth estimation
     # find the depth estimation of the source view
-    x_src = xy_src[0].reshape([height, width]).astype(np.float32)
-    y_src = xy_src[1].reshape([height, width]).astype(np.float32)
+    x_src = xy_src[0].reshape([height, width]).astype(np.float32, copy=False)
+    y_src = xy_src[1].reshape([height, width]).astype(np.float32, copy=False)
     sampled_depth_src = cv2.remap(depth_src, x_src, y_src, interpolation=cv2.INTER_LINEAR)
 
-    # source 3D space
-    # NOTE that we should use sampled source-view depth_here to project back
-    xyz_src = np.matmul(
-        np.linalg.inv(intrinsics_src), np.vstack((xy_src, np.ones_like(x_ref))) * sampled_depth_src.reshape([-1])
-    )
     # reference 3D space
-    xyz_reprojected = np.matmul(
-        np.matmul(extrinsics_ref, np.linalg.inv(extrinsics_src)), np.vstack((xyz_src, np.ones_like(x_ref)))
-    )[:3]
+    # NOTE that we should use sampled source-view depth_here to project back
+    #   the homogeneous coordinate of the source pixels is 1, so the last column is added instead of stacking a row
+    R_K_inv_ref_src = np.matmul(ref_T_src[:3, :3], intrinsics_src_inv).astype(np.float32)
+    xyz_reprojected = np.matmul(R_K_inv_ref_src[:, :2], xy_src)
+    xyz_reprojected += R_K_inv_ref_src[:, 2:3]
+    xyz_reprojected *= sampled_depth_src.reshape([-1])
+    xyz_reprojected += ref_T_src[:3, 3:4].astype(np.float32)
     # source view x, y, depth
-    depth_reprojected = xyz_reprojected[2].reshape([height, width]).astype(np.float32)
-    K_xyz_reprojected = np.matmul(intrinsics_ref, xyz_reprojected)
-    xy_reprojected = K_xyz_reprojected[:2] / K_xyz_reprojected[2:3]
-    x_reprojected = xy_reprojected[0].reshape([height, width]).astype(np.float32)
-    y_reprojected = xy_reprojected[1].reshape([height, width]).astype(np.float32)
+    depth_reprojected = xyz_reprojected[2].reshape([height, width]).astype(np.float32, copy=False)
+    K_xyz_reprojected = np.matmul(intrinsics_ref.astype(np.float32), xyz_reprojected)
+    K_xyz_reprojected[:2] /= K_xyz_reprojected[2:3]
+    xy_reprojected = K_xyz_reprojected[:2]
+    x_reprojected = xy_reprojected[0].reshape([height, width]).astype(np.float32, copy=False)
+    y_reprojected = xy_reprojected[1].reshape([height, width]).astype(np.float32, copy=False)
 
     return depth_reprojected, x_reprojected, y_reprojected, x_src, y_src
 
@@ -85,6 +141,12 @@ def check_geometric_consistency(
     extrinsics_src: np.ndarray,
     geo_pixel_thres: float,
     geo_depth_thres: float,
+    intrinsics_ref_inv: Optional[np.ndarray] = None,
+    extrinsics_ref_inv: Optional[np.ndarray] = None,
+    intrinsics_src_inv: Optional[np.ndarray] = None,
+    extrinsics_src_inv: Optional[np.ndarray] = None,
+    geo_mask_sum_out: Optional[np.ndarray] = None,
+    depth_sum_out: Optional[np.ndarray] = None,
 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
     """Check geometric consistency and return valid points
 
@@ -97,6 +159,12 @@ def check_geometric_consistency(
         extrinsics_src: camera extrinsic of the source view, of shape (4, 4)
         geo_pixel_thres: geometric pixel threshold
         geo_depth_thres: geometric depth threshold
+        intrinsics_ref_inv: optional precomputed inverse of intrinsics_ref, of shape (3, 3)
+        extrinsics_ref_inv: optional precomputed inverse of extrinsics_ref, of shape (4, 4)
+        intrinsics_src_inv: optional precomputed inverse of intrinsics_src, of shape (3, 3)
+        extrinsics_src_inv: optional precomputed inverse of extrinsics_src, of shape (4, 4)
+        geo_mask_sum_out: optional integer array of shape (H, W), the mask is added to it in place
+        depth_sum_out: optional array of shape (H, W), the (masked) reprojected depths are added to it in place
 
     Returns:
         Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
@@ -105,21 +173,217 @@ def check_geometric_consistency(
             x2d_src: x coordinates of points in the source view, of shape (H, W)
             y2d_src: y coordinates of points in the source view, of shape (H, W)
     """
-    width, height = depth_ref.shape[1], depth_ref.shape[0]
-    x_ref, y_ref = np.meshgrid(np.arange(0, width), np.arange(0, height))
+    x_ref, y_ref = pixel_grid(*depth_ref.shape[:2])
     depth_reprojected, x2d_reprojected, y2d_reprojected, x2d_src, y2d_src = reproject_with_depth(
-        depth_ref, intrinsics_ref, extrinsics_ref, depth_src, intrinsics_src, extrinsics_src
+        depth_ref,
+        intrinsics_ref,
+        extrinsics_ref,
+        depth_src,
+        intrinsics_src,
+        extrinsics_src,
+        intrinsics_ref_inv=intrinsics_ref_inv,
+        extrinsics_ref_inv=extrinsics_ref_inv,
+        intrinsics_src_inv=intrinsics_src_inv,
+        extrinsics_src_inv=extrinsics_src_inv,
     )
 
     # check |p_reproj-p_1| < 1
-    dist = np.sqrt((x2d_reprojected - x_ref) ** 2 + (y2d_reprojected - y_ref) ** 2)
+    dist = np.hypot(x2d_reprojected - x_ref, y2d_reprojected - y_ref)
 
     # check |d_reproj-d_1| / d_1 < 0.01
-    # depth_ref = np.squeeze(depth_ref, 2)
-    depth_diff = np.abs(depth_reprojected - depth_ref)
-    relative_depth_diff = depth_diff / depth_ref
+    relative_depth_diff = np.abs(depth_reprojected - depth_ref)
+    relative_depth_diff /= depth_ref
 
     mask = np.logical_and(dist < geo_pixel_thres, relative_depth_diff < geo_depth_thres)
     depth_reprojected[~mask] = 0
 
+    # Accumulate into the caller's running sums directly, so that the caller does not need another pass per view
+    if geo_mask_sum_out is not None:
+        np.add(geo_mask_sum_out, mask, out=geo_mask_sum_out)
+    if depth_sum_out is not None:
+        np.add(depth_sum_out, depth_reprojected, out=depth_sum_out)
+
+    return mask, depth_reprojected, x2d_src, y2d_src
+
+
+def _matrix_to_device(matrix: Optional[np.ndarray], device: torch.device) -> Optional[torch.Tensor]:
+    """Move a (possibly missing) camera matrix to the given device, in double precision."""
+    if matrix is None:
+        return None
+    return torch.as_tensor(matrix, dtype=torch.float64, device=device)
+
+
+def _pixel_grid_torch(
+    height: int, width: int, device: torch.device, dtype: torch.dtype
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """Build the x and y pixel coordinates of an image on the given device, each of shape (H, W)."""
+    x = torch.arange(width, device=device, dtype=dtype).repeat(height, 1)
+    y = torch.arange(height, device=device, dtype=dtype).unsqueeze(1).repeat(1, width)
+    return x, y
+
+
+@torch.no_grad()
+def reproject_with_depth_torch(
+    depth_ref: torch.Tensor,
+    intrinsics_ref: np.ndarray,
+    extrinsics_ref: np.ndarray,
+    depth_src: torch.Tensor,
+    intrinsics_src: np.ndarray,
+    extrinsics_src: np.ndarray,
+    intrinsics_ref_inv: Optional[np.ndarray] = None,
+    extrinsics_ref_inv: Optional[np.ndarray] = None,
+    intrinsics_src_inv: Optional[np.ndarray] = None,
+    extrinsics_src_inv: Optional[np.ndarray] = None,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """PyTorch version of `reproject_with_depth`, running on the device where the depth maps are stored.
+
+    Bilinear sampling of the source depth map is done with `grid_sample` (zero padding), in place of `cv2.remap`.
+
+    Args:
+        depth_ref: depths of points in the reference view, of shape (H, W)
+        intrinsics_ref: camera intrinsic of the reference view, of shape (3, 3)
+        extrinsics_ref: camera extrinsic of the reference view, of shape (4, 4)
+        depth_src: depths of points in the source view, of shape (H, W), on the same device as depth_ref
+        intrinsics_src: camera intrinsic of the source view, of shape (3, 3)
+        extrinsics_src: camera extrinsic of the source view, of shape (4, 4)
+        intrinsics_ref_inv: optional precomputed inverse of intrinsics_ref, of shape (3, 3)
+        extrinsics_ref_inv: optional precomputed inverse of extrinsics_ref, of shape (4, 4)
+        intrinsics_src_inv: optional precomputed inverse of intrinsics_src, of shape (3, 3)
+        extrinsics_src_inv: optional precomputed inverse of extrinsics_src, of shape (4, 4)
+
+    Returns:
+        A tuble contains
+            depth_reprojected: reprojected depths of points in the reference view, of shape (H, W)
+            x_reprojected: reprojected x coordinates of points in the reference view, of shape (H, W)
+            y_reprojected: reprojected y coordinates of points in the reference view, of shape (H, W)
+            x_src: x coordinates of points in the source view, of shape (H, W)
+            y_src: y coordinates of points in the source view, of shape (H, W)
+    """
+    device, dtype = depth_ref.device, depth_ref.dtype
+    height, width = depth_ref.shape[0], depth_ref.shape[1]
+
+    intrinsics_ref = _matrix_to_device(intrinsics_ref, device)
+    extrinsics_ref = _matrix_to_device(extrinsics_ref, device)
+    intrinsics_src = _matrix_to_device(intrinsics_src, device)
+    extrinsics_src = _matrix_to_device(extrinsics_src, device)
+    intrinsics_ref_inv = _matrix_to_device(intrinsics_ref_inv, device)
+    extrinsics_ref_inv = _matrix_to_device(extrinsics_ref_inv, device)
+    intrinsics_src_inv = _matrix_to_device(intrinsics_src_inv, device)
+    extrinsics_src_inv = _matrix_to_device(extrinsics_src_inv, device)
+
+    if intrinsics_ref_inv is None:
+        intrinsics_ref_inv = torch.inverse(intrinsics_ref)
+    if extrinsics_ref_inv is None:
+        extrinsics_ref_inv = torch.inverse(extrinsics_ref)
+    if intrinsics_src_inv is None:
+        intrinsics_src_inv = torch.inverse(intrinsics_src)
+    if extrinsics_src_inv is None:
+        extrinsics_src_inv = torch.inverse(extrinsics_src)
+
+    # relative poses between the two camera frames
+    src_T_ref = extrinsics_src @ extrinsics_ref_inv
+    ref_T_src = extrinsics_ref @ extrinsics_src_inv
+
+    # step1. project reference pixels to the source view
+    x_ref, y_ref = _pixel_grid_torch(height, width, device, dtype)
+    px_ref = torch.stack((x_ref.reshape(-1), y_ref.reshape(-1), torch.ones_like(x_ref).reshape(-1)))
+    H_src_ref = (intrinsics_src @ src_T_ref[:3, :3] @ intrinsics_ref_inv).to(dtype)
+    K_xyz_src = H_src_ref @ (px_ref * depth_ref.reshape(-1)) + (intrinsics_src @ src_T_ref[:3, 3:4]).to(dtype)
+    xy_src = K_xyz_src[:2] / K_xyz_src[2:3]
+    x_src = xy_src[0].reshape(height, width)
+    y_src = xy_src[1].reshape(height, width)
+
+    # step2. reproject the source view points with source view depth estimation
+    # sample the source depth at the projected locations, with coordinates normalized to [-1, 1]
+    grid = torch.stack((2.0 * x_src / (width - 1) - 1.0, 2.0 * y_src / (height - 1) - 1.0), dim=-1)
+    sampled_depth_src = F.grid_sample(
+        depth_src[None, None], grid[None], mode="bilinear", padding_mode="zeros", align_corners=True
+    )[0, 0]
+
+    # reference 3D space
+    R_K_inv_ref_src = (ref_T_src[:3, :3] @ intrinsics_src_inv).to(dtype)
+    px_src = torch.cat((xy_src, torch.ones_like(xy_src[:1])))
+    xyz_reprojected = R_K_inv_ref_src @ (px_src * sampled_depth_src.reshape(-1)) + ref_T_src[:3, 3:4].to(dtype)
+    # source view x, y, depth
+    depth_reprojected = xyz_reprojected[2].reshape(height, width)
+    K_xyz_reprojected = intrinsics_ref.to(dtype) @ xyz_reprojected
+    xy_reprojected = K_xyz_reprojected[:2] / K_xyz_reprojected[2:3]
+    x_reprojected = xy_reprojected[0].reshape(height, width)
+    y_reprojected = xy_reprojected[1].reshape(height, width)
+
+    return depth_reprojected, x_reprojected, y_reprojected, x_src, y_src
+
+
+@torch.no_grad()
+def check_geometric_consistency_torch(
+    depth_ref: torch.Tensor,
+    intrinsics_ref: np.ndarray,
+    extrinsics_ref: np.ndarray,
+    depth_src: torch.Tensor,
+    intrinsics_src: np.ndarray,
+    extrinsics_src: np.ndarray,
+    geo_pixel_thres: float,
+    geo_depth_thres: float,
+    intrinsics_ref_inv: Optional[np.ndarray] = None,
+    extrinsics_ref_inv: Optional[np.ndarray] = None,
+    intrinsics_src_inv: Optional[np.ndarray] = None,
+    extrinsics_src_inv: Optional[np.ndarray] = None,
+    geo_mask_sum_out: Optional[torch.Tensor] = None,
+    depth_sum_out: Optional[torch.Tensor] = None,
+) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+    """PyTorch version of `check_geometric_consistency`, running on the device where the depth maps are stored.
+
+    Args:
+        depth_ref: depths of points in the reference view, of shape (H, W)
+        intrinsics_ref: camera intrinsic of the reference view, of shape (3, 3)
+        extrinsics_ref: camera extrinsic of the reference view, of shape (4, 4)
+        depth_src: depths of points in the source view, of shape (H, W), on the same device as depth_ref
+        intrinsics_src: camera intrinsic of the source view, of shape (3, 3)
+        extrinsics_src: camera extrinsic of the source view, of shape (4, 4)
+        geo_pixel_thres: geometric pixel threshold
+        geo_depth_thres: geometric depth threshold
+        intrinsics_ref_inv: optional precomputed inverse of intrinsics_ref, of shape (3, 3)
+        extrinsics_ref_inv: optional precomputed inverse of extrinsics_ref, of shape (4, 4)
+        intrinsics_src_inv: optional precomputed inverse of intrinsics_src, of shape (3, 3)
+        extrinsics_src_inv: optional precomputed inverse of extrinsics_src, of shape (4, 4)
+        geo_mask_sum_out: optional integer tensor of shape (H, W), the mask is added to it in place
+        depth_sum_out: optional tensor of shape (H, W), the (masked) reprojected depths are added to it in place
+
+    Returns:
+        Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor]:
+            mask: mask for points with geometric consistency, of shape (H, W)
+            depth_reprojected: reprojected depths of points in the reference view, of shape (H, W)
+            x2d_src: x coordinates of points in the source view, of shape (H, W)
+            y2d_src: y coordinates of points in the source view, of shape (H, W)
+    """
+    height, width = depth_ref.shape[0], depth_ref.shape[1]
+    x_ref, y_ref = _pixel_grid_torch(height, width, depth_ref.device, depth_ref.dtype)
+    depth_reprojected, x2d_reprojected, y2d_reprojected, x2d_src, y2d_src = reproject_with_depth_torch(
+        depth_ref,
+        intrinsics_ref,
+        extrinsics_ref,
+        depth_src,
+        intrinsics_src,
+        extrinsics_src,
+        intrinsics_ref_inv=intrinsics_ref_inv,
+        extrinsics_ref_inv=extrinsics_ref_inv,
+        intrinsics_src_inv=intrinsics_src_inv,
+        extrinsics_src_inv=extrinsics_src_inv,
+    )
+
+    # check |p_reproj-p_1| < 1
+    dist = torch.sqrt((x2d_reprojected - x_ref) ** 2 + (y2d_reprojected - y_ref) ** 2)
+
+    # check |d_reproj-d_1| / d_1 < 0.01
+    relative_depth_diff = torch.abs(depth_reprojected - depth_ref) / depth_ref
+
+    mask = torch.logical_and(dist < geo_pixel_thres, relative_depth_diff < geo_depth_thres)
+    depth_reprojected[~mask] = 0
+
+    # Accumulate into the caller's running sums directly, which stay on the device across source views
+    if geo_mask_sum_out is not None:
+        geo_mask_sum_out += mask
+    if depth_sum_out is not None:
+        depth_sum_out += depth_reprojected
+
     return mask, depth_reprojected, x2d_src, y2d_src
@@ -85,9 +85,9 @@ def tensor2numpy(vars: Any) -> np.ndarray:
 
 @make_recursive_func
 def tocuda(vars: Any) -> Union[str, torch.Tensor]:
-    """Convert tensor to tensor on GPU"""
+    """Convert tensor to tensor on GPU, asynchronously if the tensor is in pinned memory"""
     if isinstance(vars, torch.Tensor):
-        return vars.cuda()
+        return vars.cuda(non_blocking=True)
     elif isinstance(vars, str):
         return vars
     else: